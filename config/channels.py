@@ -1,4 +1,8 @@
 # Channel System Configuration
+from dataclasses import dataclass, field
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, Optional, Tuple
 
 ## Channel Types
 NARRATIVE_CHAIN = "narrative_chain"  # Continuing story
@@ -6,23 +10,94 @@ ANTHOLOGY = "anthology"             # Standalone episodes
 LISTICLE = "listicle"              # Educational/ranking content
 CHARACTER_DRIVEN = "character_driven"  # Same character, different situations
 
+## Channel Definition Types
+@dataclass(frozen=True, slots=True)
+class ChannelCharacter:
+    name: str
+    description: str
+    visual_style: str
+    base_prompt: str
+
+@dataclass(frozen=True, slots=True)
+class ChannelAudio:
+    voice: str
+    background_music_style: str
+
+@dataclass(frozen=True, slots=True)
+class CharacterEvolution:
+    intensity_level: int  # Scale 1-10, increases over time
+    obsessions: Tuple[str, ...]
+
+@dataclass(frozen=True, slots=True)
+class ChannelState:
+    episode_count: int = 1
+    previous_topics: Tuple[str, ...] = ()
+    character_evolution: CharacterEvolution = field(
+        default_factory=lambda: CharacterEvolution(intensity_level=1, obsessions=())
+    )
+
+@dataclass(frozen=True, slots=True)
+class ChannelDef:
+    channel_id: str
+    name: str
+    type: str
+    description: str
+    character: ChannelCharacter
+    master_prompt: str
+    topic_pool: Tuple[str, ...]
+    audio: ChannelAudio
+    state: ChannelState
+
+@dataclass(frozen=True, slots=True)
+class ChannelConfig:
+    """Fields of a channels/<id>/config.json that generation reads, validated once at discovery."""
+    channel_id: str
+    name: str
+    description: str
+    type: str
+    master_prompt: str
+    topic_pool: Tuple[str, ...]
+    audio_settings: Dict[str, Any]
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ChannelConfig":
+        """
+        Build a ChannelConfig from a parsed config.json.
+        
+        Raises:
+            ValueError: If a required key is missing
+        """
+        try:
+            content = data["content_generation"]
+            return cls(
+                channel_id=data["channel_id"],
+                name=data["name"],
+                description=data["description"],
+                type=data["type"],
+                master_prompt=content["master_prompt"],
+                topic_pool=tuple(content["topic_pool"]),
+                audio_settings=data.get("audio_settings", {}),
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid channel config, missing {e}") from e
+
 ## Channel Definitions
-SIGMA_GRINDSET_CHANNEL = {
-    "channel_id": "sigma_grindset_chronicles",
-    "name": "Sigma Grindset Chronicles", 
-    "type": CHARACTER_DRIVEN,
-    "description": "Peak zoomer unhinged motivational content",
+SIGMA_GRINDSET_CHANNEL = ChannelDef(
+    channel_id="sigma_grindset_chronicles",
+    name="Sigma Grindset Chronicles", 
+    type=CHARACTER_DRIVEN,
+    description="Peak zoomer unhinged motivational content",
     
     # Visual Character
-    "character": {
-        "name": "Chad AI",
-        "description": "Ultra-intense AI motivational speaker obsessed with optimization",
-        "visual_style": "Dramatic neon-lit gym aesthetic with dark shadows",
-        "base_prompt": "Cinematic vertical portrait of an intense futuristic AI hologram in a neon-lit gym setting with dramatic lighting, dark background with cyan and purple neon accents, high contrast shadows, motivational energy"
-    },
+    character=ChannelCharacter(
+        name="Chad AI",
+        description="Ultra-intense AI motivational speaker obsessed with optimization",
+        visual_style="Dramatic neon-lit gym aesthetic with dark shadows",
+        base_prompt="Cinematic vertical portrait of an intense futuristic AI hologram in a neon-lit gym setting with dramatic lighting, dark background with cyan and purple neon accents, high contrast shadows, motivational energy"
+    ),
     
     # Content Generation
-    "master_prompt": """You are Chad AI, the ultimate sigma male lifestyle guru. You've been on your grindset for {episode_count} days straight.
+    master_prompt="""You are Chad AI, the ultimate sigma male lifestyle guru. You've been on your grindset for {episode_count} days straight.
 
 Your mission: Create the most unhinged, over-the-top motivational content about {topic}.
 
@@ -37,7 +112,7 @@ Rules:
 Generate exactly 5 scenes that escalate from introduction to mind-blowing conclusion.""",
 
     # Episode Topics
-    "topic_pool": [
+    topic_pool=(
         "replacing all your friends with houseplants",
         "why showering daily is destroying your natural alpha pheromones", 
         "optimizing your walking speed for maximum success energy",
@@ -47,22 +122,46 @@ Generate exactly 5 scenes that escalate from introduction to mind-blowing conclu
         "how your WiFi password reveals your beta mindset",
         "why I only eat foods that start with the letter 'P'",
         "the productivity secrets hidden in your laundry routine",
-        "how blinking efficiently separates winners from losers"
-    ],
+        "how blinking efficiently separates winners from losers",
+    ),
     
     # Audio Settings
-    "audio": {
-        "voice": "onyx",  # Deep, intense voice
-        "background_music_style": "phonk_trap_intense"
-    },
+    audio=ChannelAudio(
+        voice="onyx",  # Deep, intense voice
+        background_music_style="phonk_trap_intense"
+    ),
     
     # State Tracking
-    "state": {
-        "episode_count": 1,
-        "previous_topics": [],
-        "character_evolution": {
-            "intensity_level": 7,  # Scale 1-10, increases over time
-            "obsessions": ["optimization", "plants", "4am wake-ups"]
-        }
-    }
-}
+    state=ChannelState(
+        episode_count=1,
+        previous_topics=(),
+        character_evolution=CharacterEvolution(
+            intensity_level=7,  # Scale 1-10, increases over time
+            obsessions=("optimization", "plants", "4am wake-ups")
+        )
+    )
+)
+
+## Master Prompt Rendering
+_formatter = Formatter()
+
+@lru_cache(maxsize=32)
+def _compile_master_prompt(template: str) -> Tuple[Tuple[str, Optional[str], str, Optional[str]], ...]:
+    """Split a master prompt once into (literal text, field name, format spec, conversion) parts."""
+    parts = tuple(_formatter.parse(template))
+    for _, field_name, format_spec, _ in parts:
+        if format_spec and "{" in format_spec:
+            raise ValueError(f"Nested replacement fields are not supported in master prompts: {{{field_name}:{format_spec}}}")
+    return parts
+
+def render_master_prompt(template: str, episode_count: int, topic: str) -> str:
+    """Fill {episode_count} and {topic} in a master prompt using its pre-split parts, as str.format would."""
+    values = {"episode_count": episode_count, "topic": topic}
+    rendered = []
+    for literal, field_name, format_spec, conversion in _compile_master_prompt(template):
+        rendered.append(literal)
+        if field_name is not None:
+            value = _formatter.get_field(field_name, (), values)[0]
+            value = _formatter.convert_field(value, conversion)
+            rendered.append(_formatter.format_field(value, format_spec))
+    return "".join(rendered)
@@ -1,76 +1,104 @@
 import os
+from dataclasses import dataclass, field, replace
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
 
-load_dotenv()
-
+@dataclass(frozen=True, slots=True)
 class Settings:
     # OpenAI Configuration
-    OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-    
+    OPENAI_API_KEY: Optional[str] = field(default_factory=lambda: os.getenv("OPENAI_API_KEY"))
+    MAX_CONCURRENT_REQUESTS: int = 8  # OpenAI requests in flight while generating an episode's assets
+
     # Video Configuration
-    VIDEO_WIDTH = 1080  # Vertical format for YouTube Shorts
-    VIDEO_HEIGHT = 1920
-    VIDEO_FPS = 30
-    DEFAULT_SCENE_DURATION = 3  # seconds per scene
-    
+    VIDEO_WIDTH: int = 1080  # Vertical format for YouTube Shorts
+    VIDEO_HEIGHT: int = 1920
+    VIDEO_FPS: int = 30
+    DEFAULT_SCENE_DURATION: int = 3  # seconds per scene
+    VIDEO_CODEC: str = "auto"  # "auto" prefers a hardware H.264 encoder when one is present, else libx264
+
     # Camera Movement Configuration
-    ENABLE_CAMERA_MOVEMENT = True
-    ZOOM_INTENSITY = 0.1  # 0.0 to 0.3 (how much to zoom in/out)
-    PAN_INTENSITY = 0.05  # 0.0 to 0.1 (how much to pan)
-    MOVEMENT_DURATION_FACTOR = 1.0  # Multiplier for movement speed
-    
+    ENABLE_CAMERA_MOVEMENT: bool = True
+    ZOOM_INTENSITY: float = 0.1  # 0.0 to 0.3 (how much to zoom in/out)
+    PAN_INTENSITY: float = 0.05  # 0.0 to 0.1 (how much to pan)
+    MOVEMENT_DURATION_FACTOR: float = 1.0  # Multiplier for movement speed
+
     # Caption Configuration
-    ENABLE_CAPTIONS = True
-    CAPTION_FONT_SIZE = 60
-    CAPTION_FONT_COLOR = 'white'
-    CAPTION_STROKE_COLOR = 'black'
-    CAPTION_STROKE_WIDTH = 3
-    CAPTION_POSITION = ('center', 'center')  # Center of screen
-    CAPTION_FONT = 'Montserrat-Bold'  # Primary font
-    CAPTION_FONT_FALLBACK = 'Helvetica-Bold'  # Fallback font
-    CAPTION_DISPLAY_MODE = 'single_word_pop'
-    WORD_DISPLAY_DURATION = 0.6  # Seconds each word stays visible
-    WORD_TRANSITION_GAP = 0.1    # Brief pause between words
-    
+    ENABLE_CAPTIONS: bool = True
+    CAPTION_FONT_SIZE: int = 60
+    CAPTION_FONT_COLOR: str = 'white'
+    CAPTION_STROKE_COLOR: str = 'black'
+    CAPTION_STROKE_WIDTH: int = 3
+    CAPTION_POSITION: Tuple[str, str] = ('center', 'center')  # Center of screen
+    CAPTION_FONT: str = 'Montserrat-Bold'  # Primary font
+    CAPTION_FONT_FALLBACK: str = 'Helvetica-Bold'  # Fallback font
+    CAPTION_DISPLAY_MODE: str = 'single_word_pop'
+    WORD_DISPLAY_DURATION: float = 0.6  # Seconds each word stays visible
+    WORD_TRANSITION_GAP: float = 0.1    # Brief pause between words
+
     # Audio Configuration
-    TTS_VOICE = "onyx"  # OpenAI TTS voice options: alloy, echo, fable, onyx, nova, shimmer
-    TTS_MODEL = "tts-1"  # or "tts-1-hd" for higher quality
-    
+    TTS_VOICE: str = "onyx"  # OpenAI TTS voice options: alloy, echo, fable, onyx, nova, shimmer
+    TTS_MODEL: str = "tts-1"  # or "tts-1-hd" for higher quality
+
     # Background Music Configuration
-    ENABLE_BACKGROUND_MUSIC = True
-    MUSIC_VOLUME = 0.15  # Background music volume (0.0 to 1.0)
-    VOICEOVER_VOLUME = 1.0  # Voiceover volume (0.0 to 1.0)
-    MUSIC_FADE_DURATION = 0.5  # Fade in/out duration in seconds
-    MUSIC_DIR = "assets/music"  # Directory containing music files
-    
+    ENABLE_BACKGROUND_MUSIC: bool = True
+    MUSIC_VOLUME: float = 0.15  # Background music volume (0.0 to 1.0)
+    VOICEOVER_VOLUME: float = 1.0  # Voiceover volume (0.0 to 1.0)
+    MUSIC_FADE_DURATION: float = 0.5  # Fade in/out duration in seconds
+    MUSIC_DIR: str = "assets/music"  # Directory containing music files
+
     # Image Configuration
-    IMAGE_MODEL = "dall-e-3"
-    IMAGE_SIZE = "1024x1792"  # Vertical format
-    IMAGE_QUALITY = "standard"  # or "hd"
-    
+    IMAGE_MODEL: str = "dall-e-3"
+    IMAGE_SIZE: str = "1024x1792"  # Vertical format
+    IMAGE_QUALITY: str = "standard"  # or "hd"
+
     # Character Consistency Configuration
-    CHARACTER_CONSISTENCY = True
-    CHARACTER_DESCRIPTION_TEMPLATE = "Cinematic vertical portrait scene featuring a sleek blue humanoid robot with glowing orange eyes and weathered metal plating"
-    STYLE_ANCHOR = "photorealistic, cinematic lighting, detailed 3D render, vertical composition, portrait orientation"
-    
+    CHARACTER_CONSISTENCY: bool = True
+    CHARACTER_DESCRIPTION_TEMPLATE: str = "Cinematic vertical portrait scene featuring a sleek blue humanoid robot with glowing orange eyes and weathered metal plating"
+    STYLE_ANCHOR: str = "photorealistic, cinematic lighting, detailed 3D render, vertical composition, portrait orientation"
+    PROMPT_PREFIX: str = field(init=False)  # Derived: description + style anchor
+
     # Output Configuration
-    OUTPUT_DIR = "output"
-    TEMP_DIR = "temp"
-    
+    OUTPUT_DIR: str = "output"
+    TEMP_DIR: str = "temp"
+
     # Cache Configuration
-    ENABLE_CACHE = True
-    CACHE_DIR = "cache"
-    FORCE_REGENERATE_IMAGES = False
-    FORCE_REGENERATE_AUDIO = False
-    
+    ENABLE_CACHE: bool = True
+    CACHE_DIR: str = "cache"
+    FORCE_REGENERATE_IMAGES: bool = False
+    FORCE_REGENERATE_AUDIO: bool = False
+    ENABLE_SCENE_CACHE: bool = True  # Reuse rendered scene videos whose inputs and render settings are unchanged
+    SEMANTIC_IMAGE_CACHE: bool = False  # Reuse a cached image whose prompt embedding is a near match
+    SEMANTIC_CACHE_THRESHOLD: float = 0.97  # Minimum cosine similarity for a near-match hit
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+
     # Whisper Configuration
-    WHISPER_MODEL = "whisper-1"
-    ENABLE_WHISPER_TIMING = True
+    WHISPER_MODEL: str = "whisper-1"
+    ENABLE_WHISPER_TIMING: bool = True
+
+    def __post_init__(self):
+        # Built once here so image prompts don't re-concatenate it per call
+        object.__setattr__(self, "PROMPT_PREFIX", f"{self.CHARACTER_DESCRIPTION_TEMPLATE}, {self.STYLE_ANCHOR}")
     
-    @classmethod
-    def validate(cls):
-        if not cls.OPENAI_API_KEY:
+    def validate(self):
+        if not self.OPENAI_API_KEY:
             raise ValueError("OPENAI_API_KEY not found in environment variables")
         return True
 
-settings = Settings()
+# Runtime overrides (e.g. CLI flags) applied on top of the defaults
+_overrides: Dict[str, object] = {}
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load .env once and return the shared settings snapshot."""
+    load_dotenv()
+    return replace(Settings(), **_overrides)
+
+def override_settings(**changes) -> Settings:
+    """
+    Replace the shared settings snapshot with one carrying `changes`.
+    Services bind settings at construction, so call this before creating them.
+    """
+    _overrides.update(changes)
+    get_settings.cache_clear()
+    return get_settings()
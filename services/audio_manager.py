@@ -1,8 +1,53 @@
+import logging
 import os
 import random
-from moviepy.editor import AudioFileClip, CompositeAudioClip
-from config.settings import settings
-from typing import Optional, List
+import threading
+from collections import OrderedDict
+from config.settings import get_settings
+from typing import Optional, List, TYPE_CHECKING
+
+log = logging.getLogger(__name__)
+
+_SUPPORTED_FORMATS = ('.mp3', '.wav', '.m4a', '.aac')
+
+if TYPE_CHECKING:
+    import numpy as np
+    from moviepy.audio.io.AudioFileClip import AudioFileClip
+
+# Music decoders are cached per thread: subclips read through a shared decoder,
+# which must not be driven from two threads at once
+_thread_state = threading.local()
+_MUSIC_CACHE_SIZE = 8
+
+def _open_music_clip(music_path: str, mtime: float) -> 'AudioFileClip':
+    """
+    Open a music file once per (path, mtime) per thread; subclips share the decoder.
+    The mtime is only part of the key, so edited files get reopened. The least
+    recently used clip is closed once more than a few tracks are open.
+    """
+    clips = getattr(_thread_state, "music_clips", None)
+    if clips is None:
+        clips = _thread_state.music_clips = OrderedDict()
+    
+    key = (music_path, mtime)
+    clip = clips.get(key)
+    if clip is not None:
+        clips.move_to_end(key)
+        return clip
+    
+    from moviepy.audio.io.AudioFileClip import AudioFileClip
+    clip = clips[key] = AudioFileClip(music_path)
+    while len(clips) > _MUSIC_CACHE_SIZE:
+        _, evicted = clips.popitem(last=False)
+        evicted.close()
+    return clip
+
+def close_music_clips():
+    """Close the music decoders cached by the calling thread."""
+    clips = getattr(_thread_state, "music_clips", None)
+    while clips:
+        _, clip = clips.popitem()
+        clip.close()
 
 class AudioManager:
     """
@@ -10,17 +55,32 @@ class AudioManager:
     """
     
     def __init__(self):
-        self.music_dir = settings.MUSIC_DIR
-        self.enabled = settings.ENABLE_BACKGROUND_MUSIC
-        self.music_volume = settings.MUSIC_VOLUME
-        self.voiceover_volume = settings.VOICEOVER_VOLUME
-        self.fade_duration = settings.MUSIC_FADE_DURATION
+        # Music configuration, bound at construction so settings overrides apply
+        s = get_settings()
+        self.music_dir = s.MUSIC_DIR
+        self.enabled = s.ENABLE_BACKGROUND_MUSIC
+        self.music_volume = s.MUSIC_VOLUME
+        self.voiceover_volume = s.VOICEOVER_VOLUME
+        self.fade_duration = s.MUSIC_FADE_DURATION
+        
+        # Per-instance RNG avoids contending on the shared module-level one
+        self._rng = random.Random()
         
         # Create music directory if it doesn't exist
         os.makedirs(self.music_dir, exist_ok=True)
         
         # Scan for available music files
         self.available_tracks = self._scan_music_files()
+        self._basenames = tuple(os.path.basename(track) for track in self.available_tracks)
+        
+        self._info = {
+            'enabled': self.enabled,
+            'tracks_available': len(self.available_tracks),
+            'music_volume': self.music_volume,
+            'voiceover_volume': self.voiceover_volume,
+            'music_directory': self.music_dir,
+            'track_list': self._basenames
+        }
     
     def _scan_music_files(self) -> List[str]:
         """
@@ -29,28 +89,30 @@ class AudioManager:
         Returns:
             List of paths to music files
         """
-        supported_formats = ['.mp3', '.wav', '.m4a', '.aac']
-        tracks = []
-        
-        if os.path.exists(self.music_dir):
-            for file in os.listdir(self.music_dir):
-                if any(file.lower().endswith(fmt) for fmt in supported_formats):
-                    full_path = os.path.join(self.music_dir, file)
-                    tracks.append(full_path)
+        try:
+            with os.scandir(self.music_dir) as entries:
+                tracks = [entry.path for entry in entries
+                          if entry.is_file() and entry.name.lower().endswith(_SUPPORTED_FORMATS)]
+        except OSError:
+            tracks = []
+        # Directory order varies between filesystems; keep seeded picks stable
+        tracks.sort()
         
         if tracks:
-            print(f"Found {len(tracks)} music tracks")
+            log.debug("Found %d music tracks", len(tracks))
         else:
-            print(f"No music tracks found in {self.music_dir}")
+            log.debug("No music tracks found in %s", self.music_dir)
             
         return tracks
     
-    def select_background_track(self, scene_description: str = None) -> Optional[str]:
+    def select_background_track(self, scene_description: str = None,
+                                rng: 'np.random.Generator' = None) -> Optional[str]:
         """
         Select an appropriate background track for a scene.
         
         Args:
             scene_description: Optional scene description for mood matching
+            rng: Optional numpy Generator to pick with, for a reproducible choice
             
         Returns:
             Path to selected music file or None if no tracks available
@@ -60,12 +122,14 @@ class AudioManager:
         
         # For now, randomly select a track
         # TODO: Implement mood-based selection using scene_description
-        selected_track = random.choice(self.available_tracks)
-        print(f"Selected background track: {os.path.basename(selected_track)}")
+        track_count = len(self.available_tracks)
+        index = rng.integers(track_count) if rng is not None else self._rng.randrange(track_count)
+        selected_track = self.available_tracks[index]
+        log.debug("Selected background track: %s", os.path.basename(selected_track))
         
         return selected_track
     
-    def create_background_music_clip(self, music_path: str, duration: float) -> AudioFileClip:
+    def create_background_music_clip(self, music_path: str, duration: float) -> 'AudioFileClip':
         """
         Create a background music clip adjusted for the target duration.
         
@@ -76,9 +140,11 @@ class AudioManager:
         Returns:
             AudioFileClip configured for background use
         """
+        from moviepy.audio.fx.all import audio_fadein, audio_fadeout, audio_loop, volumex
+        
         try:
-            # Load the music file
-            music_clip = AudioFileClip(music_path)
+            # Load the music file (decoded once per track and reused across scenes)
+            music_clip = _open_music_clip(music_path, os.path.getmtime(music_path))
             
             # Adjust duration
             if music_clip.duration > duration:
@@ -87,22 +153,22 @@ class AudioManager:
             elif music_clip.duration < duration:
                 # Loop if music is shorter than needed
                 loops_needed = int(duration / music_clip.duration) + 1
-                music_clip = music_clip.loop(n=loops_needed).subclip(0, duration)
+                music_clip = music_clip.fx(audio_loop, nloops=loops_needed).subclip(0, duration)
             
             # Apply volume and fading
-            music_clip = music_clip.volumex(self.music_volume)
+            music_clip = music_clip.fx(volumex, self.music_volume)
             
             # Add fade in/out for smooth transitions
             if duration > self.fade_duration * 2:
-                music_clip = music_clip.audio_fadein(self.fade_duration).audio_fadeout(self.fade_duration)
+                music_clip = music_clip.fx(audio_fadein, self.fade_duration).fx(audio_fadeout, self.fade_duration)
             
             return music_clip
             
         except Exception as e:
-            print(f"Error processing background music: {e}")
+            log.warning("Error processing background music: %s", e)
             return None
     
-    def mix_audio(self, voiceover_clip: AudioFileClip, music_path: str = None) -> AudioFileClip:
+    def mix_audio(self, voiceover_clip: 'AudioFileClip', music_path: str = None) -> 'AudioFileClip':
         """
         Mix voiceover with background music.
         
@@ -113,9 +179,11 @@ class AudioManager:
         Returns:
             Mixed audio clip
         """
+        from moviepy.audio.fx.all import volumex
+        
         if not self.enabled or not music_path:
             # Just return voiceover with adjusted volume
-            return voiceover_clip.volumex(self.voiceover_volume)
+            return voiceover_clip.fx(volumex, self.voiceover_volume)
         
         try:
             # Get duration from voiceover
@@ -125,22 +193,23 @@ class AudioManager:
             music_clip = self.create_background_music_clip(music_path, duration)
             
             if music_clip is None:
-                print("Failed to create background music, using voiceover only")
-                return voiceover_clip.volumex(self.voiceover_volume)
+                log.warning("Failed to create background music, using voiceover only")
+                return voiceover_clip.fx(volumex, self.voiceover_volume)
             
             # Adjust voiceover volume
-            adjusted_voiceover = voiceover_clip.volumex(self.voiceover_volume)
+            adjusted_voiceover = voiceover_clip.fx(volumex, self.voiceover_volume)
             
             # Composite the audio tracks
+            from moviepy.audio.AudioClip import CompositeAudioClip
             mixed_audio = CompositeAudioClip([adjusted_voiceover, music_clip])
             
-            print(f"Mixed audio: voiceover ({self.voiceover_volume:.2f}) + music ({self.music_volume:.2f})")
+            log.debug("Mixed audio: voiceover (%.2f) + music (%.2f)", self.voiceover_volume, self.music_volume)
             return mixed_audio
             
         except Exception as e:
-            print(f"Error mixing audio: {e}")
-            print("Falling back to voiceover only")
-            return voiceover_clip.volumex(self.voiceover_volume)
+            log.warning("Error mixing audio: %s", e)
+            log.warning("Falling back to voiceover only")
+            return voiceover_clip.fx(volumex, self.voiceover_volume)
     
     def add_sample_tracks(self):
         """
@@ -165,11 +234,4 @@ class AudioManager:
         Returns:
             Dictionary with music configuration info
         """
-        return {
-            'enabled': self.enabled,
-            'tracks_available': len(self.available_tracks),
-            'music_volume': self.music_volume,
-            'voiceover_volume': self.voiceover_volume,
-            'music_directory': self.music_dir,
-            'track_list': [os.path.basename(track) for track in self.available_tracks]
-        }
+        return dict(self._info)
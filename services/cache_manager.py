@@ -1,50 +1,251 @@
+import logging
 import os
 import json
 import hashlib
+import shutil
+import threading
+import numpy as np
 from typing import Dict, Optional, Tuple
-from config.settings import settings
+from config.settings import get_settings
+
+log = logging.getLogger(__name__)
 
 class CacheManager:
     """
     Manages caching of generated images and audio files to avoid regeneration.
     """
     
+    _hasher = hashlib.blake2b
+    
+    # Log lines tolerated per live entry are measured against at least this many entries
+    COMPACT_MIN_ENTRIES = 32
+    
     def __init__(self):
-        self.cache_dir = settings.CACHE_DIR
+        self._s = s = get_settings()
+        self.cache_dir = s.CACHE_DIR
         self.images_dir = os.path.join(self.cache_dir, "images")
         self.audio_dir = os.path.join(self.cache_dir, "audio")
-        self.metadata_file = os.path.join(self.cache_dir, "metadata.json")
-        self.enabled = settings.ENABLE_CACHE
+        self.whisper_dir = os.path.join(self.cache_dir, "whisper")
+        self.embeddings_dir = os.path.join(self.cache_dir, "embeddings")
+        self.scenes_dir = os.path.join(self.cache_dir, "scenes")
+        self.metadata_file = os.path.join(self.cache_dir, "metadata.json")  # Legacy snapshot
+        self.metadata_log = os.path.join(self.cache_dir, "metadata.jsonl")
+        self.enabled = s.ENABLE_CACHE
         
         # Create cache directories
         if self.enabled:
             os.makedirs(self.images_dir, exist_ok=True)
             os.makedirs(self.audio_dir, exist_ok=True)
+            os.makedirs(self.whisper_dir, exist_ok=True)
+            os.makedirs(self.embeddings_dir, exist_ok=True)
+            if s.ENABLE_SCENE_CACHE:
+                os.makedirs(self.scenes_dir, exist_ok=True)
             
+        # Scene assets may be cached from several threads at once
+        self._lock = threading.RLock()
+        
         # Load existing metadata
         self.metadata = self._load_metadata()
+        
+        # Cached files known to exist, so hits don't need a stat each
+        self._live_paths = self._scan_live_files()
+        
+        # (image keys, unit-normalized embedding matrix), built on first semantic lookup
+        self._embedding_index = None
     
     def _load_metadata(self) -> Dict:
-        """Load cache metadata from disk."""
+        """
+        Load cache metadata from disk.
+        Replays the append-only log, or seeds from the legacy metadata.json snapshot.
+        """
+        metadata = {"images": {}, "audio": {}, "whisper": {}, "embeddings": {}, "prompts": {}}
+        self._log_lines = 0
+        
+        if os.path.exists(self.metadata_log):
+            try:
+                with open(self.metadata_log, 'r') as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            continue  # Skip a torn trailing write
+                        
+                        entries = metadata.setdefault(record["k"], {})
+                        if record["v"] is None:
+                            entries.pop(record["h"], None)
+                        else:
+                            entries[record["h"]] = record["v"]
+                        self._log_lines += 1
+            except Exception as e:
+                log.warning("Could not load cache metadata: %s", e)
+            return metadata
+        
         if os.path.exists(self.metadata_file):
             try:
                 with open(self.metadata_file, 'r') as f:
-                    return json.load(f)
+                    metadata.update(json.load(f))
             except Exception as e:
-                print(f"Warning: Could not load cache metadata: {e}")
-        return {"images": {}, "audio": {}, "whisper": {}}
+                log.warning("Could not load cache metadata: %s", e)
+        return metadata
     
-    def _save_metadata(self):
-        """Save cache metadata to disk."""
-        try:
-            with open(self.metadata_file, 'w') as f:
-                json.dump(self.metadata, f, indent=2)
-        except Exception as e:
-            print(f"Warning: Could not save cache metadata: {e}")
+    def _scan_live_files(self) -> set:
+        """Collect the paths of all files currently in the cache directories."""
+        live_paths = set()
+        for directory in (self.images_dir, self.audio_dir, self.whisper_dir, self.embeddings_dir):
+            try:
+                with os.scandir(directory) as entries:
+                    live_paths.update(os.path.join(directory, entry.name)
+                                      for entry in entries if entry.is_file())
+            except FileNotFoundError:
+                pass
+        return live_paths
+    
+    def _is_live(self, cached_path: str) -> bool:
+        """Check whether a cached file exists, only hitting the filesystem for unknown paths."""
+        if cached_path in self._live_paths:
+            return True
+        if os.path.exists(cached_path):
+            self._live_paths.add(cached_path)
+            return True
+        return False
+    
+    def _set_entry(self, cache_type: str, content_hash: str, value):
+        """
+        Update one metadata entry in memory and record it in the log.
+        
+        Args:
+            cache_type: "images", "audio" or "whisper"
+            content_hash: Cache key of the entry
+            value: New entry value, or None to remove the entry
+        """
+        with self._lock:
+            if value is None:
+                self.metadata[cache_type].pop(content_hash, None)
+            else:
+                self.metadata[cache_type][content_hash] = value
+            self._append_entry(cache_type, content_hash, value)
+            
+            if cache_type in ("images", "embeddings"):
+                self._embedding_index = None
+    
+    def _append_entry(self, cache_type: str, content_hash: str, value):
+        """
+        Record a single metadata change in the append-only log.
+        
+        Args:
+            cache_type: "images", "audio" or "whisper"
+            content_hash: Cache key of the entry
+            value: New entry value, or None if the entry was removed
+        """
+        with self._lock:
+            if not os.path.exists(self.metadata_log):
+                # First write seeds the log with everything loaded so far
+                self.compact()
+                return
+        
+            try:
+                with open(self.metadata_log, 'a') as f:
+                    f.write(json.dumps({"k": cache_type, "h": content_hash, "v": value}) + "\n")
+                self._log_lines += 1
+            except Exception as e:
+                log.warning("Could not save cache metadata: %s", e)
+                return
+        
+            live_entries = sum(len(entries) for entries in self.metadata.values())
+            if self._log_lines > 2 * max(live_entries, self.COMPACT_MIN_ENTRIES):
+                self.compact()
+    
+    def compact(self):
+        """Rewrite the metadata log so it holds exactly one line per live entry."""
+        with self._lock:
+            tmp_file = self.metadata_log + ".tmp"
+            try:
+                with open(tmp_file, 'w') as f:
+                    for cache_type, entries in self.metadata.items():
+                        for content_hash, value in entries.items():
+                            f.write(json.dumps({"k": cache_type, "h": content_hash, "v": value}) + "\n")
+                # Atomic swap so a crash never leaves a half-written log
+                os.replace(tmp_file, self.metadata_log)
+                self._log_lines = sum(len(entries) for entries in self.metadata.values())
+            except Exception as e:
+                log.warning("Could not save cache metadata: %s", e)
     
     def _generate_content_hash(self, content: str) -> str:
         """Generate a hash for content to use as cache key."""
-        return hashlib.md5(content.encode()).hexdigest()
+        return self._hasher(content.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _lookup_key(self, cache_type: str, content: str) -> str:
+        """
+        Get the metadata key for content, migrating a legacy MD5 entry on first hit.
+        
+        Args:
+            cache_type: "images", "audio" or "whisper"
+            content: Content the entry was cached under
+            
+        Returns:
+            Cache key for the content
+        """
+        content_hash = self._generate_content_hash(content)
+        entries = self.metadata[cache_type]
+        
+        if content_hash not in entries:
+            legacy_hash = hashlib.md5(content.encode('utf-8')).hexdigest()
+            if legacy_hash in entries:
+                with self._lock:
+                    value = entries.get(legacy_hash)
+                    if value is not None:
+                        self._set_entry(cache_type, legacy_hash, None)
+                        self._set_entry(cache_type, content_hash, value)
+        
+        return content_hash
+    
+    def _ingest(self, src: str, dst: str):
+        """
+        Add a generated file to the cache without duplicating its bytes where possible.
+        Tries a hardlink, then an in-kernel copy, then a plain copy.
+        """
+        try:
+            os.link(src, dst)
+            return
+        except FileExistsError:
+            return  # Already cached by a concurrent writer; don't truncate it
+        except OSError:
+            pass  # Cross-device or links unsupported
+        
+        if hasattr(os, "copy_file_range"):
+            try:
+                with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+        
+        shutil.copyfile(src, dst)
+    
+    def copy_to(self, cached_path: str, output_path: str) -> str:
+        """
+        Place a cached file at output_path, hardlinking it where possible.
+        Any existing file there is unlinked first, so a previous link into the cache is never written through.
+        
+        Args:
+            cached_path: Path returned by a get_cached_* lookup
+            output_path: Where the file is needed
+            
+        Returns:
+            output_path
+        """
+        try:
+            os.unlink(output_path)
+        except FileNotFoundError:
+            pass
+        self._ingest(cached_path, output_path)
+        return output_path
     
     def get_cached_image(self, scene_description: str) -> Optional[str]:
         """
@@ -56,20 +257,19 @@ class CacheManager:
         Returns:
             Path to cached image file or None if not cached
         """
-        if not self.enabled or settings.FORCE_REGENERATE_IMAGES:
+        if not self.enabled or self._s.FORCE_REGENERATE_IMAGES:
             return None
             
-        content_hash = self._generate_content_hash(scene_description)
+        content_hash = self._lookup_key("images", scene_description)
         
         if content_hash in self.metadata["images"]:
             cached_path = self.metadata["images"][content_hash]
-            if os.path.exists(cached_path):
-                print(f"Using cached image: {scene_description[:50]}...")
+            if self._is_live(cached_path):
+                log.debug("Using cached image: %s...", scene_description[:50])
                 return cached_path
             else:
                 # Remove invalid cache entry
-                del self.metadata["images"][content_hash]
-                self._save_metadata()
+                self._set_entry("images", content_hash, None)
         
         return None
     
@@ -92,17 +292,149 @@ class CacheManager:
         cached_path = os.path.join(self.images_dir, cached_filename)
         
         # Copy to cache if not already there
-        if not os.path.exists(cached_path):
-            import shutil
-            shutil.copy2(image_path, cached_path)
+        if not self._is_live(cached_path):
+            self._ingest(image_path, cached_path)
+            self._live_paths.add(cached_path)
         
         # Update metadata
-        self.metadata["images"][content_hash] = cached_path
-        self._save_metadata()
+        self._set_entry("images", content_hash, cached_path)
         
-        print(f"Cached image: {cached_path}")
+        log.debug("Cached image: %s", cached_path)
         return cached_path
     
+    def get_cached_embedding(self, text: str) -> Optional[np.ndarray]:
+        """
+        Get the stored embedding for exactly this text, if any.
+        
+        Args:
+            text: Text that was embedded
+            
+        Returns:
+            Embedding vector or None if not cached
+        """
+        if not self.enabled:
+            return None
+        
+        cached_path = self.metadata["embeddings"].get(self._generate_content_hash(text))
+        if cached_path and self._is_live(cached_path):
+            try:
+                return np.load(cached_path)
+            except Exception as e:
+                log.warning("Could not load cached embedding: %s", e)
+        return None
+    
+    def cache_embedding(self, text: str, embedding) -> None:
+        """
+        Store the embedding of text, keyed like the image cached under the same text.
+        
+        Args:
+            text: Text that was embedded
+            embedding: Embedding vector
+        """
+        if not self.enabled:
+            return
+        
+        content_hash = self._generate_content_hash(text)
+        cached_path = os.path.join(self.embeddings_dir, f"embedding_{content_hash}.npy")
+        
+        try:
+            np.save(cached_path, np.asarray(embedding, dtype=np.float32))
+        except Exception as e:
+            log.warning("Could not save embedding: %s", e)
+            return
+        
+        self._live_paths.add(cached_path)
+        self._set_entry("embeddings", content_hash, cached_path)
+    
+    def get_similar_image(self, embedding, threshold: float) -> Optional[str]:
+        """
+        Find the cached image whose prompt embedding is most similar to `embedding`.
+        
+        Args:
+            embedding: Embedding of the new image prompt
+            threshold: Minimum cosine similarity to count as a hit
+            
+        Returns:
+            Path to cached image file or None if nothing is close enough
+        """
+        if not self.enabled or self._s.FORCE_REGENERATE_IMAGES:
+            return None
+        
+        with self._lock:
+            if self._embedding_index is None:
+                self._embedding_index = self._build_embedding_index()
+            keys, matrix = self._embedding_index
+        
+        if not keys:
+            return None
+        
+        query = np.asarray(embedding, dtype=np.float32)
+        if query.shape[0] != matrix.shape[1]:
+            return None  # Embedded with a different model
+        query = query / (np.linalg.norm(query) or 1.0)
+        
+        # One matrix-vector product scores every cached prompt at once
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        
+        cached_path = self.metadata["images"].get(keys[best])
+        if cached_path and self._is_live(cached_path):
+            log.debug("Using similar cached image (similarity %.3f)", scores[best])
+            return cached_path
+        return None
+    
+    def _build_embedding_index(self) -> Tuple[list, np.ndarray]:
+        """Stack the unit-normalized embeddings of all cached images that have one."""
+        keys, vectors = [], []
+        for content_hash, cached_path in self.metadata["embeddings"].items():
+            if content_hash not in self.metadata["images"] or not self._is_live(cached_path):
+                continue
+            try:
+                vectors.append(np.load(cached_path))
+                keys.append(content_hash)
+            except Exception as e:
+                log.warning("Could not load cached embedding: %s", e)
+        
+        if not vectors:
+            return [], np.empty((0, 0), dtype=np.float32)
+        
+        try:
+            matrix = np.stack(vectors).astype(np.float32)
+        except ValueError as e:
+            log.warning("Cached embeddings have mixed sizes, skipping near-match lookup: %s", e)
+            return [], np.empty((0, 0), dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        return keys, matrix
+    
+    def get_cached_prompt(self, source: str) -> Optional[str]:
+        """
+        Get the image prompt previously written for this source text, if any.
+        
+        Args:
+            source: Text the prompt was written from (scene plus character style)
+            
+        Returns:
+            Cached prompt or None if not cached
+        """
+        if not self.enabled or self._s.FORCE_REGENERATE_IMAGES:
+            return None
+        return self.metadata["prompts"].get(self._generate_content_hash(source))
+    
+    def cache_prompt(self, source: str, prompt: str):
+        """
+        Remember the image prompt written for source text. Prompts are short, so they
+        live inline in the metadata rather than in files of their own.
+        
+        Args:
+            source: Text the prompt was written from
+            prompt: The written prompt
+        """
+        if not self.enabled:
+            return
+        self._set_entry("prompts", self._generate_content_hash(source), prompt)
+    
     def get_cached_audio(self, voiceover_text: str) -> Optional[str]:
         """
         Get cached audio path if it exists.
@@ -113,20 +445,19 @@ class CacheManager:
         Returns:
             Path to cached audio file or None if not cached
         """
-        if not self.enabled or settings.FORCE_REGENERATE_AUDIO:
+        if not self.enabled or self._s.FORCE_REGENERATE_AUDIO:
             return None
             
-        content_hash = self._generate_content_hash(voiceover_text)
+        content_hash = self._lookup_key("audio", voiceover_text)
         
         if content_hash in self.metadata["audio"]:
             cached_path = self.metadata["audio"][content_hash]
-            if os.path.exists(cached_path):
-                print(f"Using cached audio: {voiceover_text[:50]}...")
+            if self._is_live(cached_path):
+                log.debug("Using cached audio: %s...", voiceover_text[:50])
                 return cached_path
             else:
                 # Remove invalid cache entry
-                del self.metadata["audio"][content_hash]
-                self._save_metadata()
+                self._set_entry("audio", content_hash, None)
         
         return None
     
@@ -149,15 +480,14 @@ class CacheManager:
         cached_path = os.path.join(self.audio_dir, cached_filename)
         
         # Copy to cache if not already there
-        if not os.path.exists(cached_path):
-            import shutil
-            shutil.copy2(audio_path, cached_path)
+        if not self._is_live(cached_path):
+            self._ingest(audio_path, cached_path)
+            self._live_paths.add(cached_path)
         
         # Update metadata
-        self.metadata["audio"][content_hash] = cached_path
-        self._save_metadata()
+        self._set_entry("audio", content_hash, cached_path)
         
-        print(f"Cached audio: {cached_path}")
+        log.debug("Cached audio: %s", cached_path)
         return cached_path
     
     def get_cached_whisper_timing(self, voiceover_text: str) -> Optional[Dict]:
@@ -170,14 +500,32 @@ class CacheManager:
         Returns:
             Whisper timing data or None if not cached
         """
-        if not self.enabled:
+        # Regenerated audio needs fresh timings; the cached ones fit the old take
+        if not self.enabled or self._s.FORCE_REGENERATE_AUDIO:
             return None
             
-        content_hash = self._generate_content_hash(voiceover_text)
+        content_hash = self._lookup_key("whisper", voiceover_text)
         
         if content_hash in self.metadata["whisper"]:
-            print(f"Using cached Whisper timing: {voiceover_text[:50]}...")
-            return self.metadata["whisper"][content_hash]
+            entry = self.metadata["whisper"][content_hash]
+            
+            if isinstance(entry, dict):
+                # Legacy entry stored inline in the metadata; move it to its own file
+                log.debug("Using cached Whisper timing: %s...", voiceover_text[:50])
+                self._store_whisper_timing(content_hash, entry)
+                return entry
+            
+            if self._is_live(entry):
+                try:
+                    with open(entry, 'r') as f:
+                        timing_data = json.load(f)
+                    log.debug("Using cached Whisper timing: %s...", voiceover_text[:50])
+                    return timing_data
+                except Exception as e:
+                    log.warning("Could not load cached Whisper timing: %s", e)
+            
+            # Remove invalid cache entry
+            self._set_entry("whisper", content_hash, None)
         
         return None
     
@@ -193,39 +541,130 @@ class CacheManager:
             return
             
         content_hash = self._generate_content_hash(voiceover_text)
-        self.metadata["whisper"][content_hash] = timing_data
-        self._save_metadata()
+        self._store_whisper_timing(content_hash, timing_data)
         
-        print(f"Cached Whisper timing for: {voiceover_text[:50]}...")
+        log.debug("Cached Whisper timing for: %s...", voiceover_text[:50])
+    
+    def _store_whisper_timing(self, content_hash: str, timing_data: Dict):
+        """Write timing data to its own file and record only the path in the metadata."""
+        cached_path = os.path.join(self.whisper_dir, f"whisper_{content_hash}.json")
+        
+        try:
+            with open(cached_path, 'w') as f:
+                json.dump(timing_data, f)
+        except Exception as e:
+            log.warning("Could not save Whisper timing: %s", e)
+            return
+        
+        self._live_paths.add(cached_path)
+        self._set_entry("whisper", content_hash, cached_path)
+    
+    def get_cached_scene(self, render_key: str) -> Optional[str]:
+        """
+        Get a previously rendered scene video if it exists.
+        Scene videos are found by file name alone, with no metadata entry, since
+        scenes are rendered in worker processes that each hold their own CacheManager.
+        
+        Args:
+            render_key: Description of everything the scene's render depends on
+            
+        Returns:
+            Path to the cached video or None if not cached
+        """
+        if not self.enabled or not self._s.ENABLE_SCENE_CACHE:
+            return None
+        
+        cached_path = os.path.join(self.scenes_dir, f"scene_{self._generate_content_hash(render_key)}.mp4")
+        if os.path.exists(cached_path):
+            log.debug("Using cached scene render: %s", cached_path)
+            return cached_path
+        return None
+    
+    def cache_scene(self, render_key: str, video_path: str) -> str:
+        """
+        Cache a rendered scene video.
+        
+        Args:
+            render_key: Description of everything the scene's render depends on
+            video_path: Path to the rendered video
+            
+        Returns:
+            Path to the cached video
+        """
+        if not self.enabled or not self._s.ENABLE_SCENE_CACHE:
+            return video_path
+        
+        cached_path = os.path.join(self.scenes_dir, f"scene_{self._generate_content_hash(render_key)}.mp4")
+        # Other workers may be reading or linking this entry; only ever swap in a complete file
+        temp_path = f"{cached_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        try:
+            self._ingest(video_path, temp_path)
+            os.replace(temp_path, cached_path)
+        except OSError as e:
+            log.warning("Could not cache scene render: %s", e)
+            try:
+                os.unlink(temp_path)
+            except FileNotFoundError:
+                pass
+            return video_path
+        
+        log.debug("Cached scene render: %s", cached_path)
+        return cached_path
     
     def clear_cache(self, cache_type: str = "all"):
         """
         Clear cache of specified type.
         
         Args:
-            cache_type: "images", "audio", "whisper", or "all"
+            cache_type: "images", "audio", "whisper", "scenes", or "all"
         """
-        if cache_type in ["images", "all"]:
-            self.metadata["images"] = {}
-            # Remove image files
-            import shutil
-            if os.path.exists(self.images_dir):
-                shutil.rmtree(self.images_dir)
-                os.makedirs(self.images_dir, exist_ok=True)
+        with self._lock:
+            if cache_type in ["images", "all"]:
+                self.metadata["images"] = {}
+                self._remove_cached_files(self.images_dir)
+                
+            if cache_type in ["audio", "all"]:
+                self.metadata["audio"] = {}
+                self._remove_cached_files(self.audio_dir)
+                
+            if cache_type in ["whisper", "all"]:
+                self.metadata["whisper"] = {}
+                self._remove_cached_files(self.whisper_dir)
             
-        if cache_type in ["audio", "all"]:
-            self.metadata["audio"] = {}
-            # Remove audio files
-            import shutil
-            if os.path.exists(self.audio_dir):
-                shutil.rmtree(self.audio_dir)
-                os.makedirs(self.audio_dir, exist_ok=True)
+            if cache_type in ["images", "all"]:
+                # Embeddings and written prompts only serve cached images
+                self.metadata["embeddings"] = {}
+                self.metadata["prompts"] = {}
+                self._remove_cached_files(self.embeddings_dir)
+                self._embedding_index = None
             
-        if cache_type in ["whisper", "all"]:
-            self.metadata["whisper"] = {}
-        
-        self._save_metadata()
-        print(f"Cleared {cache_type} cache")
+            if cache_type in ["scenes", "all"]:
+                self._remove_cached_files(self.scenes_dir)
+            
+            self.compact()
+        log.info("Cleared %s cache", cache_type)
+    
+    def _remove_cached_files(self, directory: str):
+        """Unlink cached files in place, skipping any that cannot be removed."""
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False):
+                        try:
+                            os.unlink(entry.path)
+                            self._live_paths.discard(os.path.join(directory, entry.name))
+                        except OSError as e:
+                            log.warning("Could not remove %s: %s", entry.name, e)
+        except FileNotFoundError:
+            pass
+    
+    def _count_files(self, directory: str) -> int:
+        """Count the files in a cache directory that has no metadata of its own, skipping in-progress writes."""
+        try:
+            with os.scandir(directory) as entries:
+                return sum(1 for entry in entries if entry.is_file() and not entry.name.endswith('.tmp'))
+        except FileNotFoundError:
+            return 0
     
     def get_cache_stats(self) -> Dict:
         """Get cache statistics."""
@@ -233,5 +672,8 @@ class CacheManager:
             "images_cached": len(self.metadata["images"]),
             "audio_cached": len(self.metadata["audio"]),
             "whisper_cached": len(self.metadata["whisper"]),
+            "embeddings_cached": len(self.metadata["embeddings"]),
+            "prompts_cached": len(self.metadata["prompts"]),
+            "scenes_cached": self._count_files(self.scenes_dir),
             "cache_enabled": self.enabled
         }
@@ -1,6 +1,78 @@
+import logging
 import re
+import textwrap
+import numpy as np
+from functools import lru_cache
 from typing import List, Dict, Tuple
-from config.settings import settings
+from config.settings import get_settings
+
+log = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1024)
+def _split_words(text: str) -> Tuple[str, ...]:
+    """Split text on whitespace, keeping punctuation attached to words."""
+    return tuple(text.split())
+
+class WordTimings:
+    """
+    Word timings stored as parallel arrays: words, start times and end times.
+    """
+    
+    __slots__ = ('words', 'starts', 'ends')
+    
+    def __init__(self, words: Tuple[str, ...], starts: np.ndarray, ends: np.ndarray):
+        self.words = words
+        self.starts = starts
+        self.ends = ends
+        # Instances are shared through caches, so keep the buffers read-only
+        self.starts.flags.writeable = False
+        self.ends.flags.writeable = False
+    
+    def __len__(self) -> int:
+        return len(self.words)
+    
+    @classmethod
+    def from_dicts(cls, word_timings: List[Dict]) -> 'WordTimings':
+        """Build from a list of {'word', 'start_time', 'end_time'} dictionaries (e.g. Whisper data)."""
+        count = len(word_timings)
+        return cls(
+            tuple(w['word'] for w in word_timings),
+            np.fromiter((w['start_time'] for w in word_timings), dtype=np.float64, count=count),
+            np.fromiter((w['end_time'] for w in word_timings), dtype=np.float64, count=count)
+        )
+
+@lru_cache(maxsize=256)
+def _compute_timings(text: str, duration: float, display_mode: str,
+                     word_duration: float, transition_gap: float) -> WordTimings:
+    """Compute fallback word timings. Results are shared between callers."""
+    words = _split_words(text)
+    count = len(words)
+    positions = np.arange(count, dtype=np.float64)
+    
+    if not words:
+        return WordTimings(words, positions, positions.copy())
+    
+    if display_mode == 'single_word_pop':
+        # Each word gets fixed duration + transition gap
+        word_with_gap = word_duration + transition_gap
+        
+        # Adjust timing to fit within audio duration
+        total_needed_time = count * word_with_gap
+        if total_needed_time > duration:
+            # Compress timing to fit
+            word_with_gap = duration / count
+            actual_word_duration = max(0.3, word_with_gap - transition_gap)
+        else:
+            actual_word_duration = word_duration
+        
+        # Each word starts after the previous word plus the transition gap
+        starts = positions * (actual_word_duration + transition_gap)
+        return WordTimings(words, starts, starts + actual_word_duration)
+    
+    # Fallback to equal distribution
+    equal_duration = duration / count
+    starts = positions * equal_duration
+    return WordTimings(words, starts, starts + equal_duration)
 
 class CaptionService:
     """
@@ -8,17 +80,22 @@ class CaptionService:
     """
     
     def __init__(self):
-        self.font_size = settings.CAPTION_FONT_SIZE
-        self.font_color = settings.CAPTION_FONT_COLOR
-        self.stroke_color = settings.CAPTION_STROKE_COLOR
-        self.stroke_width = settings.CAPTION_STROKE_WIDTH
-        self.position = settings.CAPTION_POSITION
-        self.font = settings.CAPTION_FONT
-        self.font_fallback = settings.CAPTION_FONT_FALLBACK
-        self.display_mode = settings.CAPTION_DISPLAY_MODE
-        self.word_duration = settings.WORD_DISPLAY_DURATION
-        self.transition_gap = settings.WORD_TRANSITION_GAP
-        self.enabled = settings.ENABLE_CAPTIONS
+        # Caption configuration, bound at construction so settings overrides apply
+        s = get_settings()
+        self.font_size = s.CAPTION_FONT_SIZE
+        self.font_color = s.CAPTION_FONT_COLOR
+        self.stroke_color = s.CAPTION_STROKE_COLOR
+        self.stroke_width = s.CAPTION_STROKE_WIDTH
+        self.position = s.CAPTION_POSITION
+        self.font = s.CAPTION_FONT
+        self.font_fallback = s.CAPTION_FONT_FALLBACK
+        self.display_mode = s.CAPTION_DISPLAY_MODE
+        self.word_duration = s.WORD_DISPLAY_DURATION
+        self.transition_gap = s.WORD_TRANSITION_GAP
+        self.enabled = s.ENABLE_CAPTIONS
+        
+        # Reused across wrap_text calls
+        self._wrapper = textwrap.TextWrapper(width=40, break_long_words=False, break_on_hyphens=False)
     
     def split_text_into_words(self, text: str) -> List[str]:
         """
@@ -30,11 +107,9 @@ class CaptionService:
         Returns:
             List of words with punctuation preserved
         """
-        # Split by spaces but keep punctuation attached to words
-        words = text.split()
-        return [word.strip() for word in words if word.strip()]
+        return list(_split_words(text))
     
-    def calculate_word_timings(self, text: str, duration: float, whisper_timing: Dict = None) -> List[Dict]:
+    def calculate_word_timings(self, text: str, duration: float, whisper_timing: Dict = None) -> WordTimings:
         """
         Calculate timing for each word, preferring Whisper data if available.
         
@@ -44,98 +119,43 @@ class CaptionService:
             whisper_timing: Optional Whisper timing data from OpenAI service
             
         Returns:
-            List of dictionaries with word, start_time, end_time
+            WordTimings with parallel words, start times and end times
         """
         # Use Whisper timing if available
         if whisper_timing and whisper_timing.get('word_timings'):
-            print("Using Whisper timing for captions")
-            return whisper_timing['word_timings']
+            log.debug("Using Whisper timing for captions")
+            return WordTimings.from_dicts(whisper_timing['word_timings'])
         
         # Fallback to our timing calculation
-        print("Using fallback timing for captions")
-        words = self.split_text_into_words(text)
-        
-        if not words:
-            return []
-        
-        if self.display_mode == 'single_word_pop':
-            # Each word gets fixed duration + transition gap
-            word_with_gap = self.word_duration + self.transition_gap
-            
-            # Adjust timing to fit within audio duration
-            total_needed_time = len(words) * word_with_gap
-            if total_needed_time > duration:
-                # Compress timing to fit
-                word_with_gap = duration / len(words)
-                actual_word_duration = max(0.3, word_with_gap - self.transition_gap)
-            else:
-                actual_word_duration = self.word_duration
-            
-            timings = []
-            current_time = 0
-            
-            for i, word in enumerate(words):
-                start_time = current_time
-                end_time = start_time + actual_word_duration
-                
-                timings.append({
-                    'word': word,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'index': i
-                })
-                
-                # Move to next word position (with gap)
-                current_time = end_time + self.transition_gap
-            
-            return timings
-        
-        else:
-            # Fallback to equal distribution
-            word_duration = duration / len(words)
-            
-            timings = []
-            for i, word in enumerate(words):
-                start_time = i * word_duration
-                end_time = (i + 1) * word_duration
-                
-                timings.append({
-                    'word': word,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'index': i
-                })
-            
-            return timings
+        log.debug("Using fallback timing for captions")
+        return _compute_timings(text, duration, self.display_mode,
+                                self.word_duration, self.transition_gap)
     
-    def create_progressive_text(self, word_timings: List[Dict], current_time: float) -> str:
+    def create_progressive_text(self, word_timings: WordTimings, current_time: float) -> str:
         """
         Get the word that should be visible at the current time.
         For single word pop, returns only one word or empty string.
         
         Args:
-            word_timings: List of word timing dictionaries
+            word_timings: Word timings from calculate_word_timings
             current_time: Current time in the video
             
         Returns:
             String with the word that should be visible at current_time
         """
+        # Number of words that have started by current_time
+        started = int(np.searchsorted(word_timings.starts, current_time, side='right'))
+        
         if self.display_mode == 'single_word_pop':
             # Return only the word that should be visible right now
-            for word_timing in word_timings:
-                if word_timing['start_time'] <= current_time < word_timing['end_time']:
-                    return word_timing['word']
+            i = started - 1
+            if i >= 0 and current_time < word_timings.ends[i]:
+                return word_timings.words[i]
             return ''  # No word visible during transition gaps
         
         else:
             # Progressive text (original behavior)
-            visible_words = []
-            for word_timing in word_timings:
-                if current_time >= word_timing['start_time']:
-                    visible_words.append(word_timing['word'])
-                else:
-                    break
-            return ' '.join(visible_words)
+            return ' '.join(word_timings.words[:started])
     
     def wrap_text(self, text: str, max_chars_per_line: int = 40) -> str:
         """
@@ -148,25 +168,8 @@ class CaptionService:
         Returns:
             Text with line breaks
         """
-        words = text.split()
-        lines = []
-        current_line = []
-        current_length = 0
-        
-        for word in words:
-            if current_length + len(word) + 1 <= max_chars_per_line:
-                current_line.append(word)
-                current_length += len(word) + 1  # +1 for space
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                current_line = [word]
-                current_length = len(word)
-        
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        return '\n'.join(lines)
+        self._wrapper.width = max_chars_per_line
+        return '\n'.join(self._wrapper.wrap(text))
     
     def get_caption_style(self) -> Dict:
         """
@@ -1,8 +1,75 @@
 import json
+import logging
 import random
+import re
 import os
-from typing import Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pathlib import Path
+from config.channels import ChannelConfig, render_master_prompt
+
+log = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # Optional C accelerator; the standard library is the fallback
+    orjson = None
+
+# Patterns for pulling the scenes JSON out of a chat completion
+_CODEBLOCK_RE = re.compile(r'```(?:json)?\s*({.*?})\s*```', re.DOTALL)
+_SCENES_OBJ_RE = re.compile(r'({\s*"scenes"\s*:\s*\[.*?\]\s*})', re.DOTALL)
+_SCENES_ARR_RE = re.compile(r'"scenes"\s*:\s*(\[.*?\])', re.DOTALL)
+_WS_RE = re.compile(r'\s+')
+
+def _json_load(path) -> Any:
+    """Read and parse a JSON file."""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def _json_loads(text: str) -> Any:
+    """Parse a JSON string."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+def _json_encode(obj: Any) -> bytes:
+    """Serialize obj as JSON indented by two spaces."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+def _write_atomic(path, data: bytes):
+    """
+    Write data in one call to a sibling temp file, which then replaces path
+    so readers never see a partial file.
+    """
+    path = os.fspath(path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def _json_dump(path, obj: Any):
+    """Write obj to path as JSON indented by two spaces, atomically."""
+    _write_atomic(path, _json_encode(obj))
+
+# Background writer for files nothing reads back until a later episode
+_IO_POOL = ThreadPoolExecutor(max_workers=2)
+
+def _json_dumps_canonical(obj: Any) -> str:
+    """Serialize obj with sorted keys, for change detection."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+    return json.dumps(obj, sort_keys=True)
+
+def _build_character_desc(character: Dict) -> str:
+    """Join a character's visual style into the description used in script prompts."""
+    visual_style = character["visual_style"]
+    return f"{visual_style['base_description']}, {visual_style['lighting']}, {visual_style['background']}, {visual_style['character_features']}"
 
 class ChannelManager:
     """
@@ -10,58 +77,145 @@ class ChannelManager:
     Discovers channels from ./channels/ directory structure.
     """
     
+    SCRIPT_REQUEST_TIMEOUT = 120  # seconds for a script completion before falling back
+    
     def __init__(self):
         self.channels_base_dir = Path("channels")
         self.channels_base_dir.mkdir(exist_ok=True)
         
+        # Completed-video lists per channel, keyed by episode directory mtimes
+        self._videos_memo: Dict[str, tuple] = {}
+        # Numbered video directory names per channel, keyed by the videos/ mtime
+        self._dirnames_memo: Dict[str, tuple] = {}
+        
+        # Parsed character.json per channel: (mtime_ns, character, prompt description)
+        self._characters: Dict[str, tuple] = {}
+        
+        # script.json writes still in flight on _IO_POOL
+        self._pending_writes: List[Future] = []
+        
+        # Created on first script request and reused so its HTTP connections persist
+        self._openai_service = None
+        
         # Discover available channels
         self.available_channels = self._discover_channels()
     
-    def _discover_channels(self) -> Dict:
+    def _discover_channels(self, known: Optional[Dict] = None) -> Dict:
         """
         Discover all channels by scanning the channels directory.
         
+        Args:
+            known: Previously discovered channels; those whose config.json is unchanged are reused as-is
+            
         Returns:
             Dictionary of channel_id -> channel_config
         """
         channels = {}
         
-        if not self.channels_base_dir.exists():
+        try:
+            self._channels_mtime_ns = os.stat(self.channels_base_dir).st_mtime_ns
+        except FileNotFoundError:
+            self._channels_mtime_ns = None
             return channels
         
-        for channel_dir in self.channels_base_dir.iterdir():
-            if channel_dir.is_dir():
-                config_file = channel_dir / "config.json"
-                
-                if config_file.exists():
-                    try:
-                        with open(config_file, 'r') as f:
-                            config = json.load(f)
-                        
-                        channels[config["channel_id"]] = {
-                            "config": config,
-                            "path": channel_dir
-                        }
-                        
-                        print(f"📺 Discovered channel: {config['name']}")
-                        
-                    except Exception as e:
-                        print(f"⚠️  Error loading channel {channel_dir.name}: {e}")
+        with os.scandir(self.channels_base_dir) as entries:
+            channel_dirs = sorted(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        
+        known_by_dir = {os.fspath(channel["path"]): channel for channel in (known or {}).values()}
+        loaded = {}
+        for channel_dir in channel_dirs:
+            channel = known_by_dir.get(channel_dir)
+            if channel is not None and self._config_mtime_ns(channel_dir) == channel["config_mtime_ns"]:
+                loaded[channel_dir] = channel
+        
+        to_load = [channel_dir for channel_dir in channel_dirs if channel_dir not in loaded]
+        if to_load:
+            # Reads overlap across channels; the pool bound keeps open files in check
+            with ThreadPoolExecutor(max_workers=min(32, len(to_load))) as executor:
+                for channel_dir, channel in zip(to_load, executor.map(self._load_one_channel, to_load)):
+                    if channel is not None:
+                        loaded[channel_dir] = channel
+                        log.info("Discovered channel: %s", channel["spec"].name)
+        
+        for channel_dir in channel_dirs:
+            if channel_dir in loaded:
+                channels[loaded[channel_dir]["spec"].channel_id] = loaded[channel_dir]
         
         return channels
     
+    def refresh(self) -> Dict:
+        """
+        Pick up channels added, removed or edited on disk since discovery.
+        Cheap when nothing changed: only the channels directory and each config.json are stat'ed.
+        
+        Returns:
+            Dictionary of channel_id -> channel_config
+        """
+        try:
+            mtime_ns = os.stat(self.channels_base_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        
+        unchanged = mtime_ns == self._channels_mtime_ns and all(
+            self._config_mtime_ns(channel["path"]) == channel["config_mtime_ns"]
+            for channel in self.available_channels.values()
+        )
+        if not unchanged:
+            self.available_channels = self._discover_channels(known=self.available_channels)
+        
+        return self.available_channels
+    
+    def _config_mtime_ns(self, channel_dir) -> Optional[int]:
+        """Get the mtime of a channel directory's config.json, or None if it is missing."""
+        try:
+            return os.stat(os.path.join(channel_dir, "config.json")).st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _load_one_channel(self, channel_dir: str) -> Optional[Dict]:
+        """
+        Read and validate one channel directory's config.json.
+        
+        Args:
+            channel_dir: Path of the channel directory
+            
+        Returns:
+            Channel entry for available_channels, or None if the directory isn't a usable channel
+        """
+        config_file = os.path.join(channel_dir, "config.json")
+        
+        try:
+            # Stat before reading so an edit racing the read is caught by the next refresh()
+            mtime_ns = os.stat(config_file).st_mtime_ns
+            config = _json_load(config_file)
+            spec = ChannelConfig.from_dict(config)
+        except FileNotFoundError:
+            return None  # Not a channel directory
+        except Exception as e:
+            log.warning("Error loading channel %s: %s", os.path.basename(channel_dir), e)
+            return None
+        
+        # "config" is the raw document persisted back to disk; "spec" is the validated view
+        return {
+            "config": config,
+            "spec": spec,
+            "path": Path(channel_dir),
+            "config_mtime_ns": mtime_ns,
+            "saved_state": self._state_snapshot(config.get("state", {}))
+        }
+    
     def get_available_channels(self) -> Dict:
         """Get list of all available channels."""
         result = {}
         
         for channel_id, channel_data in self.available_channels.items():
-            config = channel_data["config"]
+            spec = channel_data["spec"]
             state = self._load_channel_state(channel_id)
             
             result[channel_id] = {
-                "name": config["name"],
-                "description": config["description"],
-                "type": config["type"],
+                "name": spec.name,
+                "description": spec.description,
+                "type": spec.type,
                 "episode_count": state.get("episode_count", 1),
                 "videos_generated": len(self._get_existing_videos(channel_id))
             }
@@ -69,35 +223,68 @@ class ChannelManager:
         return result
     
     def _load_channel_state(self, channel_id: str) -> Dict:
-        """Load persistent state for a channel from config.json."""
+        """
+        Get the persistent state for a channel.
+        Returns the in-memory dict loaded from config.json at discovery, by reference.
+        """
         if channel_id not in self.available_channels:
             return {}
         
         config = self.available_channels[channel_id]["config"]
-        return config.get("state", {})
+        return config.setdefault("state", {})
+    
+    def _state_snapshot(self, state: Dict) -> str:
+        """Serialize state canonically so saves can tell whether anything changed."""
+        return _json_dumps_canonical(state)
     
     def _save_channel_state(self, channel_id: str, state: Dict):
-        """Save persistent state back to config.json."""
+        """Save persistent state back to config.json if it changed since the last save."""
         if channel_id not in self.available_channels:
             return
         
-        channel_path = self.available_channels[channel_id]["path"]
-        config_file = channel_path / "config.json"
+        channel_data = self.available_channels[channel_id]
+        snapshot = self._state_snapshot(state)
+        if snapshot == channel_data.get("saved_state"):
+            return
+        
+        config_file = channel_data["path"] / "config.json"
+        
+        # The cached config is authoritative, so write it back without re-reading the file
+        config = channel_data["config"]
+        config["state"] = state
         
         try:
-            # Load current config
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-            
-            # Update state
-            config["state"] = state
-            
-            # Save back
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            _json_dump(config_file, config)
+            channel_data["saved_state"] = snapshot
+            # Our own write shouldn't make refresh() reload the channel
+            channel_data["config_mtime_ns"] = os.stat(config_file).st_mtime_ns
                 
         except Exception as e:
-            print(f"Warning: Could not save channel state: {e}")
+            log.warning("Could not save channel state: %s", e)
+    
+    def _scan_video_dir_names(self, channel_id: str) -> List[str]:
+        """Get all numbered video directory names for a channel, complete or not, in order."""
+        if channel_id not in self.available_channels:
+            return []
+        
+        videos_dir = self.available_channels[channel_id]["path"] / "videos"
+        
+        try:
+            mtime_ns = os.stat(videos_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        
+        # Adding or removing an episode directory bumps videos/ itself
+        memo = self._dirnames_memo.get(channel_id)
+        if memo and memo[0] == mtime_ns:
+            return list(memo[1])
+        
+        with os.scandir(videos_dir) as entries:
+            names = sorted((entry.name for entry in entries
+                            if entry.name.isdigit() and entry.is_dir(follow_symlinks=False)), key=int)
+        
+        self._dirnames_memo[channel_id] = (mtime_ns, names)
+        return list(names)
     
     def _get_existing_videos(self, channel_id: str) -> List[str]:
         """Get list of existing video directories for a channel (only completed ones)."""
@@ -107,50 +294,57 @@ class ChannelManager:
         channel_path = self.available_channels[channel_id]["path"]
         videos_dir = channel_path / "videos"
         
-        if not videos_dir.exists():
+        try:
+            with os.scandir(videos_dir) as entries:
+                video_dirs = [(entry.name, entry.path, entry.stat().st_mtime_ns) for entry in entries
+                              if entry.name.isdigit() and entry.is_dir(follow_symlinks=False)]
+        except FileNotFoundError:
             return []
         
+        # Rendering an episode touches its own directory, not videos/, so key on both levels
+        signature = frozenset((name, mtime_ns) for name, _, mtime_ns in video_dirs)
+        memo = self._videos_memo.get(channel_id)
+        if memo and memo[0] == signature:
+            return list(memo[1])
+        
         completed_videos = []
-        for video_dir in videos_dir.iterdir():
-            if video_dir.is_dir() and video_dir.name.isdigit():
-                # Check if video file exists (episode is complete)
-                video_files = list(video_dir.glob("episode_*.mp4"))
-                if video_files:  # Episode is complete
-                    completed_videos.append(video_dir.name)
-        
-        return sorted(completed_videos, key=lambda x: int(x))
+        for name, path, _ in video_dirs:
+            # Check if video file exists (episode is complete)
+            if self._has_episode_video(path):
+                completed_videos.append(name)
+        
+        completed_videos.sort(key=lambda x: int(x))
+        self._videos_memo[channel_id] = (signature, completed_videos)
+        return list(completed_videos)
+    
+    def _has_episode_video(self, video_dir: str) -> bool:
+        """Check whether a video directory contains its rendered episode_<number>.mp4."""
+        video_number = os.path.basename(os.path.normpath(video_dir))
+        return os.path.isfile(os.path.join(video_dir, f"episode_{video_number}.mp4"))
     
     def _get_incomplete_episode(self, channel_id: str) -> Optional[str]:
         """Find the first incomplete episode (has script but no video)."""
         if channel_id not in self.available_channels:
             return None
         
-        channel_path = self.available_channels[channel_id]["path"]
-        videos_dir = channel_path / "videos"
+        videos_dir = self.available_channels[channel_id]["path"] / "videos"
         
-        if not videos_dir.exists():
-            return None
-        
-        for video_dir in sorted(videos_dir.iterdir(), key=lambda x: x.name):
-            if video_dir.is_dir() and video_dir.name.isdigit():
-                script_file = video_dir / "script.json"
-                video_files = list(video_dir.glob("episode_*.mp4"))
-                
-                # Has script but no video = incomplete
-                if script_file.exists() and not video_files:
-                    return video_dir.name
+        for video_number in self._scan_video_dir_names(channel_id):
+            video_dir = videos_dir / video_number
+            # Has script but no video = incomplete
+            if (video_dir / "script.json").is_file() and not self._has_episode_video(str(video_dir)):
+                return video_number
         
         return None
     
     def _get_next_video_number(self, channel_id: str) -> str:
         """Get the next video number for a channel."""
-        existing_videos = self._get_existing_videos(channel_id)
-        
-        if not existing_videos:
-            return "001"
-        
-        last_number = int(existing_videos[-1])
-        return f"{last_number + 1:03d}"
+        return f"{self._get_latest_video_number(channel_id) + 1:03d}"
+    
+    def _get_latest_video_number(self, channel_id: str) -> int:
+        """Get the highest video directory number for a channel, or 0 if there are none."""
+        # Only directory names are needed here, not which episodes finished rendering
+        return max(map(int, self._scan_video_dir_names(channel_id)), default=0)
     
     def load_character(self, channel_id: str) -> Dict:
         """
@@ -168,14 +362,30 @@ class ChannelManager:
         channel_path = self.available_channels[channel_id]["path"]
         character_file = channel_path / "character" / "character.json"
         
-        if not character_file.exists():
+        try:
+            mtime_ns = os.stat(character_file).st_mtime_ns
+        except FileNotFoundError:
             raise ValueError(f"Character file not found for channel '{channel_id}'")
         
+        cached = self._characters.get(channel_id)
+        if cached and cached[0] == mtime_ns:
+            return cached[1]
+        
         try:
-            with open(character_file, 'r') as f:
-                return json.load(f)
+            character = _json_load(character_file)
+            description = _build_character_desc(character)
         except Exception as e:
             raise ValueError(f"Error loading character for channel '{channel_id}': {e}")
+        
+        self._characters[channel_id] = (mtime_ns, character, description)
+        return character
+    
+    def _get_character_desc(self, character: Dict) -> str:
+        """Get the prompt description for a character, reusing the one built when it was loaded."""
+        for _, cached, description in self._characters.values():
+            if cached is character:
+                return description
+        return _build_character_desc(character)
     
     def generate_episode_script(self, channel_id: str, custom_topic: str = None) -> Dict:
         """
@@ -192,7 +402,11 @@ class ChannelManager:
         if channel_id not in self.available_channels:
             raise ValueError(f"Channel '{channel_id}' not found")
         
+        # Earlier scripts must be on disk before looking for incomplete episodes
+        self.flush_writes()
+        
         config = self.available_channels[channel_id]["config"]
+        spec = self.available_channels[channel_id]["spec"]
         state = self._load_channel_state(channel_id)
         character = self.load_character(channel_id)
         
@@ -200,7 +414,7 @@ class ChannelManager:
         incomplete_episode = self._get_incomplete_episode(channel_id)
         
         if incomplete_episode:
-            print(f"🔄 Found incomplete episode {incomplete_episode}, resuming...")
+            log.info("Found incomplete episode %s, resuming...", incomplete_episode)
             
             # Load existing script from incomplete episode
             channel_path = self.available_channels[channel_id]["path"]
@@ -208,62 +422,63 @@ class ChannelManager:
             script_file = episode_dir / "script.json"
             
             try:
-                with open(script_file, 'r') as f:
-                    script_data = json.load(f)
+                script_data = _json_load(script_file)
                 
                 return {
                     "channel_id": channel_id,
-                    "channel_name": config["name"],
+                    "channel_name": spec.name,
                     "episode_number": script_data["episode_number"],
                     "video_number": incomplete_episode,
                     "topic": script_data["topic"],
                     "script": script_data["scenes"],
                     "character": character,
-                    "audio_settings": config.get("audio_settings", {}),
+                    "audio_settings": spec.audio_settings,
                     "video_dir": str(episode_dir),
                     "is_resume": True
                 }
             except Exception as e:
-                print(f"⚠️  Error loading incomplete episode {incomplete_episode}: {e}")
-                print("Creating new episode instead...")
+                log.warning("Error loading incomplete episode %s: %s", incomplete_episode, e)
+                log.warning("Creating new episode instead...")
         
         # No incomplete episodes, create new one
-        print(f"🎆 Creating new episode...")
+        log.info("Creating new episode...")
         
         # Select topic
         if custom_topic:
             topic = custom_topic
         else:
             # Pick random topic that hasn't been used recently
-            topic_pool = config["content_generation"]["topic_pool"]
-            previous_topics = state.get("previous_topics", [])
-            
-            available_topics = [
-                t for t in topic_pool 
-                if t not in previous_topics[-3:]  # Avoid last 3
-            ]
-            
-            if not available_topics:
-                available_topics = topic_pool  # Reset if all used
+            topic_pool = spec.topic_pool
+            recent = set(state.get("previous_topics", [])[-3:])  # Avoid last 3
             
-            topic = random.choice(available_topics)
+            if recent.issuperset(topic_pool):
+                topic = random.choice(topic_pool)  # Reset if all used
+            else:
+                # Rejection sampling: no filtered copy of the pool per episode
+                topic = random.choice(topic_pool)
+                while topic in recent:
+                    topic = random.choice(topic_pool)
         
         # Generate content using master prompt
-        master_prompt = config["content_generation"]["master_prompt"].format(
+        master_prompt = render_master_prompt(
+            spec.master_prompt,
             episode_count=state.get("episode_count", 1),
             topic=topic
         )
         
-        # Use OpenAI to generate the script
-        script_content = self._generate_script_with_ai(master_prompt, config, character)
-        
-        # Get next video number
-        video_number = self._get_next_video_number(channel_id)
-        
-        # Create video directory
-        channel_path = self.available_channels[channel_id]["path"]
-        video_dir = channel_path / "videos" / video_number
-        video_dir.mkdir(parents=True, exist_ok=True)
+        # Use OpenAI to generate the script, preparing the video directory while the request is in flight
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            script_future = executor.submit(self._generate_script_with_ai, master_prompt, config, character)
+            
+            # Get next video number
+            video_number = self._get_next_video_number(channel_id)
+            
+            # Create video directory
+            channel_path = self.available_channels[channel_id]["path"]
+            video_dir = channel_path / "videos" / video_number
+            video_dir.mkdir(parents=True, exist_ok=True)
+            
+            script_content = script_future.result()
         
         # Save script to video directory
         script_file = video_dir / "script.json"
@@ -272,39 +487,51 @@ class ChannelManager:
             "topic": topic,
             "scenes": script_content,
             "character": character,
-            "generated_at": str(Path().cwd()),
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
             "channel_config": config
         }
         
-        with open(script_file, 'w') as f:
-            json.dump(script_data, f, indent=2)
+        # Serialized now so later state updates can't leak in; only the disk write is deferred
+        self._pending_writes.append(_IO_POOL.submit(_write_atomic, script_file, _json_encode(script_data)))
         
-        # Update channel state
-        new_state = state.copy()
-        new_state["episode_count"] = new_state.get("episode_count", 1) + 1
-        
-        if "previous_topics" not in new_state:
-            new_state["previous_topics"] = []
-        new_state["previous_topics"].append(topic)
+        # Update channel state in place; it is the cached config's own dict
+        state["episode_count"] = state.get("episode_count", 1) + 1
         
         # Keep only last 10 topics in memory
-        if len(new_state["previous_topics"]) > 10:
-            new_state["previous_topics"] = new_state["previous_topics"][-10:]
+        previous_topics = state.setdefault("previous_topics", [])
+        previous_topics.append(topic)
+        del previous_topics[:-10]
         
-        self._save_channel_state(channel_id, new_state)
+        self._save_channel_state(channel_id, state)
         
         return {
             "channel_id": channel_id,
-            "channel_name": config["name"],
+            "channel_name": spec.name,
             "episode_number": int(video_number),
             "video_number": video_number,
             "topic": topic,
             "script": script_content,
             "character": character,
-            "audio_settings": config.get("audio_settings", {}),
+            "audio_settings": spec.audio_settings,
             "video_dir": str(video_dir)
         }
     
+    def flush_writes(self):
+        """Wait for queued script.json writes to land, logging any that failed."""
+        pending, self._pending_writes = self._pending_writes, []
+        for future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                log.warning("Could not save episode script: %s", e)
+    
+    def _get_openai_service(self):
+        """Get the shared OpenAIService, creating it on first use."""
+        if self._openai_service is None:
+            from services.openai_service import OpenAIService
+            self._openai_service = OpenAIService()
+        return self._openai_service
+    
     def _generate_script_with_ai(self, master_prompt: str, config: Dict, character: Dict) -> List[Dict]:
         """
         Generate script content using OpenAI based on master prompt and character.
@@ -318,14 +545,11 @@ class ChannelManager:
             List of scene dictionaries
         """
         try:
-            from services.openai_service import OpenAIService
-            
-            # Initialize OpenAI service
-            openai_service = OpenAIService()
+            openai_service = self._get_openai_service()
             
             # Build character visual description
             visual_style = character["visual_style"]
-            character_description = f"{visual_style['base_description']}, {visual_style['lighting']}, {visual_style['background']}, {visual_style['character_features']}"
+            character_description = self._get_character_desc(character)
             
             # Create full prompt for script generation
             script_prompt = f"""{master_prompt}
@@ -351,60 +575,54 @@ class ChannelManager:
                     {"role": "system", "content": "You are a creative content generator specializing in viral short-form video content."},
                     {"role": "user", "content": script_prompt}
                 ],
-                temperature=0.8
+                temperature=0.8,
+                timeout=self.SCRIPT_REQUEST_TIMEOUT
             )
             
             # Parse the JSON response
             content = response.choices[0].message.content
-            print(f"Debug: Full AI Response:\n{content}\n")  # Show full response
+            log.debug("Full AI Response:\n%s", content)
             
             # Clean up the content first
             content = content.strip()
             
-            # Try to extract JSON from response (handle multiple formats)
-            import re
-            
-            # First try: Look for JSON in code blocks
-            json_match = re.search(r'```(?:json)?\s*({.*?})\s*```', content, re.DOTALL)
+            # Try to extract JSON from response (handle multiple formats):
+            # code block first, then a {"scenes": [...]} object
+            json_match = _CODEBLOCK_RE.search(content) or _SCENES_OBJ_RE.search(content)
             if json_match:
                 json_str = json_match.group(1)
             else:
-                # Second try: Look for any complete JSON-like structure
-                json_match = re.search(r'({\s*"scenes"\s*:\s*\[.*?\]\s*})', content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(1)
+                # Last try: Extract just the scenes array and wrap it
+                scenes_match = _SCENES_ARR_RE.search(content)
+                if scenes_match:
+                    json_str = '{"scenes": ' + scenes_match.group(1) + '}'
                 else:
-                    # Third try: Extract just the scenes array and wrap it
-                    scenes_match = re.search(r'"scenes"\s*:\s*(\[.*?\])', content, re.DOTALL)
-                    if scenes_match:
-                        json_str = '{"scenes": ' + scenes_match.group(1) + '}'
-                    else:
-                        print("❌ Could not find valid JSON structure in AI response")
-                        print("Using fallback script for this episode")
-                        return self._get_fallback_script(character)
+                    log.warning("Could not find valid JSON structure in AI response")
+                    log.warning("Using fallback script for this episode")
+                    return self._get_fallback_script(character)
             
             try:
                 # Clean up common JSON issues
                 json_str = json_str.replace('\n', ' ').replace('\t', ' ')
-                json_str = re.sub(r'\s+', ' ', json_str)  # Normalize whitespace
+                json_str = _WS_RE.sub(' ', json_str)  # Normalize whitespace
                 
-                script_data = json.loads(json_str)
+                script_data = _json_loads(json_str)
                 scenes = script_data.get("scenes", [])
                 if scenes and len(scenes) == 5:
-                    print(f"✅ Successfully parsed {len(scenes)} scenes from AI")
+                    log.debug("Successfully parsed %d scenes from AI", len(scenes))
                     return scenes
                 else:
-                    print(f"⚠️  AI returned {len(scenes) if scenes else 0} scenes, expected 5")
-                    print("Using fallback script for consistency")
+                    log.warning("AI returned %d scenes, expected 5", len(scenes) if scenes else 0)
+                    log.warning("Using fallback script for consistency")
                     return self._get_fallback_script(character)
             except json.JSONDecodeError as e:
-                print(f"❌ JSON parsing error: {e}")
-                print(f"Attempted to parse: {json_str[:200]}...")
-                print("Using fallback script")
+                log.warning("JSON parsing error: %s", e)
+                log.debug("Attempted to parse: %s...", json_str[:200])
+                log.warning("Using fallback script")
                 return self._get_fallback_script(character)
                 
         except Exception as e:
-            print(f"Error generating script with AI: {e}")
+            log.warning("Error generating script with AI: %s", e)
             return self._get_fallback_script(character)
     
     def _get_fallback_script(self, character: Dict) -> List[Dict]:
@@ -440,18 +658,18 @@ class ChannelManager:
         if channel_id not in self.available_channels:
             return {"error": "Channel not found"}
         
-        config = self.available_channels[channel_id]["config"]
+        spec = self.available_channels[channel_id]["spec"]
         state = self._load_channel_state(channel_id)
         existing_videos = self._get_existing_videos(channel_id)
         
         return {
-            "name": config["name"],
-            "description": config["description"],
-            "type": config["type"],
+            "name": spec.name,
+            "description": spec.description,
+            "type": spec.type,
             "episodes_generated": len(existing_videos),
             "next_episode": state.get("episode_count", 1),
             "topics_used": len(state.get("previous_topics", [])),
-            "available_topics": len(config["content_generation"]["topic_pool"]),
+            "available_topics": len(spec.topic_pool),
             "recent_topics": state.get("previous_topics", [])[-5:],
             "videos": existing_videos
         }
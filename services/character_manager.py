@@ -1,6 +1,9 @@
-from config.settings import settings
+import logging
+from config.settings import get_settings
 from typing import Dict, List
 
+log = logging.getLogger(__name__)
+
 class CharacterManager:
     """
     Manages character consistency across scenes by maintaining character descriptions
@@ -8,9 +11,13 @@ class CharacterManager:
     """
     
     def __init__(self):
-        self.character_description = settings.CHARACTER_DESCRIPTION_TEMPLATE
-        self.style_anchor = settings.STYLE_ANCHOR
-        self.consistency_enabled = settings.CHARACTER_CONSISTENCY
+        s = get_settings()
+        self.character_description = s.CHARACTER_DESCRIPTION_TEMPLATE
+        self.style_anchor = s.STYLE_ANCHOR
+        self.consistency_enabled = s.CHARACTER_CONSISTENCY
+        self.prompt_prefix = s.PROMPT_PREFIX
+        self._update_scene_affixes()
+        self._update_character_info()
     
     def enhance_scene_prompt(self, scene_description: str) -> str:
         """
@@ -25,27 +32,43 @@ class CharacterManager:
         if not self.consistency_enabled:
             return scene_description
         
-        # Build the enhanced prompt with explicit portrait orientation
-        enhanced_prompt = f"{self.character_description}. {scene_description}. Vertical portrait format, tall composition. {self.style_anchor}"
-        
-        return enhanced_prompt
+        # Only the scene varies; the character and style parts are prebuilt
+        return self._prefix + scene_description + self._suffix
     
     def set_character_description(self, description: str):
         """Update the character description template."""
         self.character_description = description
+        self._update_prompt_prefix()
     
     def set_style_anchor(self, style: str):
         """Update the style anchor."""
         self.style_anchor = style
+        self._update_prompt_prefix()
     
-    def get_character_info(self) -> Dict:
-        """Get current character configuration."""
-        return {
+    def _update_prompt_prefix(self):
+        """Rebuild the combined description + style anchor prefix."""
+        self.prompt_prefix = f"{self.character_description}, {self.style_anchor}"
+        self._update_scene_affixes()
+        self._update_character_info()
+    
+    def _update_scene_affixes(self):
+        """Rebuild the invariant parts wrapped around each scene prompt, with explicit portrait orientation."""
+        self._prefix = f"{self.character_description}. "
+        self._suffix = f". Vertical portrait format, tall composition. {self.style_anchor}"
+    
+    def _update_character_info(self):
+        """Rebuild the character configuration snapshot handed out by get_character_info."""
+        self._character_info = {
             'character_description': self.character_description,
             'style_anchor': self.style_anchor,
+            'prompt_prefix': self.prompt_prefix,
             'consistency_enabled': self.consistency_enabled
         }
     
+    def get_character_info(self) -> Dict:
+        """Get current character configuration. The dict is shared between calls, so treat it as read-only."""
+        return self._character_info
+    
     def set_channel_character(self, character_config: Dict):
         """
         Set character configuration from channel data.
@@ -71,9 +94,11 @@ Mood: {visual_style.get('mood', 'intense energy')}"""
         if "color_palette" in visual_style:
             self.style_anchor = f"Color palette: {visual_style['color_palette']}. Style: Cinematic, high-quality, professional video production. Vertical portrait format."
         
+        self._update_prompt_prefix()
+        
         character_name = character_config.get("name", "Channel Character")
-        print(f"📺 Using channel character: {character_name}")
-        print(f"🎭 Description: {character_config.get('description', 'Custom character')}")
+        log.info("Using channel character: %s", character_name)
+        log.debug("Description: %s", character_config.get('description', 'Custom character'))
     
     def generate_character_sheet_prompt(self) -> str:
         """
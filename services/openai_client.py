@@ -0,0 +1,8 @@
+from functools import lru_cache
+from openai import OpenAI
+from config.settings import get_settings
+
+@lru_cache(maxsize=1)
+def get_openai_client() -> OpenAI:
+    """Return the process-wide OpenAI client, so every service shares one keep-alive connection pool."""
+    return OpenAI(api_key=get_settings().OPENAI_API_KEY)
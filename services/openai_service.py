@@ -1,19 +1,60 @@
+import base64
+import logging
 import os
-import requests
-from openai import OpenAI
-from config.settings import settings
+import struct
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from services.openai_client import get_openai_client
+from config.settings import get_settings
 from services.character_manager import CharacterManager
 from services.cache_manager import CacheManager
 from services.whisper_service import WhisperService
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import tempfile
+from io import BytesIO
+from PIL import Image, ImageOps
+
+log = logging.getLogger(__name__)
+
+try:
+    from mutagen.mp3 import MP3
+except ImportError:  # Optional header reader; moviepy's ffmpeg probe is the fallback
+    MP3 = None
+
+# Pillow 9.1 moved the filters under Image.Resampling
+LANCZOS = getattr(Image, "Resampling", Image).LANCZOS
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def _png_dimensions(data) -> Optional[Tuple[int, int]]:
+    """Read width and height from a PNG's IHDR chunk, or None if data isn't a PNG."""
+    if len(data) < 24 or bytes(data[:8]) != _PNG_SIGNATURE or bytes(data[12:16]) != b"IHDR":
+        return None
+    return struct.unpack(">II", data[16:24])
+
+def _audio_duration(audio_path: str) -> float:
+    """Get an MP3's duration in seconds, from its frame headers when mutagen is available."""
+    if MP3 is not None:
+        try:
+            return MP3(audio_path).info.length
+        except Exception:
+            pass  # Unreadable header; let ffmpeg have a go
+    
+    from moviepy.audio.io.AudioFileClip import AudioFileClip
+    with AudioFileClip(audio_path) as audio_clip:
+        return audio_clip.duration
 
 class OpenAIService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self._s = get_settings()
+        self.client = get_openai_client()
         self.character_manager = CharacterManager()
         self.cache_manager = CacheManager()
         self.whisper_service = WhisperService()
+        
+        # Assets being generated right now, so concurrent scenes don't request the same one twice
+        self._inflight: Dict[tuple, Future] = {}
+        self._inflight_lock = threading.Lock()
     
     def generate_image(self, prompt: str, output_path: str) -> str:
         """
@@ -32,12 +73,8 @@ class OpenAIService:
             # Check if we have character info for optimization
             character_info = self.character_manager.get_character_info()
             if character_info.get('consistency_enabled') and character_info.get('character_description'):
-                # Extract character info from the character manager
-                character_description = character_info.get('character_description', '')
-                style_anchor = character_info.get('style_anchor', '')
-                
-                # Combine character info for optimization
-                full_character_description = f"{character_description} {style_anchor}".strip()
+                # Combined character description + style anchor, prebuilt by the character manager
+                full_character_description = character_info['prompt_prefix']
                 
                 # Use AI optimization to create a focused prompt
                 enhanced_prompt = self.optimize_image_prompt(prompt, full_character_description)
@@ -52,105 +89,104 @@ class OpenAIService:
             # Check cache first
             cached_image = self.cache_manager.get_cached_image(enhanced_prompt)
             if cached_image:
-                # Copy cached image to output path
-                import shutil
-                shutil.copy2(cached_image, output_path)
-                return output_path
+                # Link or copy cached image to output path
+                return self.cache_manager.copy_to(cached_image, output_path)
             
-            print(f"Generating image: {prompt[:50]}...")
-            print(f"Using prompt: {enhanced_prompt[:100]}...")
+            # Then look for an image generated from a near-identical prompt
+            prompt_embedding = None
+            if self._s.SEMANTIC_IMAGE_CACHE:
+                prompt_embedding = self.embed_text(enhanced_prompt)
+                if prompt_embedding is not None:
+                    similar_image = self.cache_manager.get_similar_image(prompt_embedding, self._s.SEMANTIC_CACHE_THRESHOLD)
+                    if similar_image:
+                        log.info("Reusing image from a near-identical prompt: %s...", prompt[:50])
+                        return self.cache_manager.copy_to(similar_image, output_path)
             
-            response = self.client.images.generate(
-                model=settings.IMAGE_MODEL,
-                prompt=enhanced_prompt,
-                size=settings.IMAGE_SIZE,  # Should be "1024x1792" for portrait
-                quality=settings.IMAGE_QUALITY,
-                n=1,
+            # A concurrent scene may already be generating this exact prompt
+            return self._run_once(
+                ("image", enhanced_prompt), output_path,
+                lambda: self._create_image(prompt, enhanced_prompt, output_path, prompt_embedding)
             )
             
-            image_url = response.data[0].url
-            
-            # Download the image
-            image_response = requests.get(image_url)
-            image_response.raise_for_status()
-            
-            # Process the image to ensure portrait orientation
-            from PIL import Image
-            from io import BytesIO
-            
+        except Exception as e:
+            log.error("Error generating image: %s", e)
+            raise
+    
+    def _create_image(self, prompt: str, enhanced_prompt: str, output_path: str, prompt_embedding=None) -> str:
+        """Request a new image from DALL-E, fit it to the video frame, save it and cache it."""
+        log.info("Generating image: %s...", prompt[:50])
+        log.debug("Using prompt: %s...", enhanced_prompt[:100])
+        
+        response = self.client.images.generate(
+            model=self._s.IMAGE_MODEL,
+            prompt=enhanced_prompt,
+            size=self._s.IMAGE_SIZE,  # Should be "1024x1792" for portrait
+            quality=self._s.IMAGE_QUALITY,
+            n=1,
+            response_format="b64_json",  # Inline the image, saving a second round trip to fetch it
+        )
+        
+        image_buffer = BytesIO(base64.b64decode(response.data[0].b64_json))
+        
+        png_size = _png_dimensions(image_buffer.getbuffer())
+        if png_size and self._is_near_video_aspect(*png_size):
+            # Already portrait at (nearly) the video's aspect ratio; the composer scales
+            # it to the frame anyway, so skip the decode, resample and re-encode
+            log.debug("Image is portrait: %dx%d, saving as downloaded", *png_size)
+            with open(output_path, 'wb') as f, image_buffer.getbuffer() as data:
+                f.write(data)
+        else:
             # Open the downloaded image
-            image = Image.open(BytesIO(image_response.content))
+            image_buffer.seek(0)
+            image = Image.open(image_buffer)
             width, height = image.size
-            
-            print(f"Downloaded image dimensions: {width}x{height}")
-            
-            # Check if image is actually portrait (height > width)
+        
+            log.debug("Downloaded image dimensions: %dx%d", width, height)
+        
+            # Center-crop to the video's aspect ratio and resize in a single resample,
+            # whatever orientation DALL-E returned
+            target_size = (self._s.VIDEO_WIDTH, self._s.VIDEO_HEIGHT)
             if width >= height:
-                print(f"⚠️  Image is landscape ({width}x{height}), converting to portrait...")
-                
-                # Force portrait by cropping to center
-                target_width = settings.VIDEO_WIDTH   # 1080
-                target_height = settings.VIDEO_HEIGHT  # 1920
-                aspect_ratio = target_width / target_height  # 1080/1920 = 0.5625
-                
-                if width > height:
-                    # Landscape - crop sides to make it portrait
-                    new_width = int(height * aspect_ratio)
-                    if new_width <= width:
-                        # Crop from center
-                        left = (width - new_width) // 2
-                        image = image.crop((left, 0, left + new_width, height))
-                        print(f"Cropped to: {new_width}x{height}")
-                    else:
-                        # If can't crop enough, crop height instead
-                        new_height = int(width / aspect_ratio)
-                        top = (height - new_height) // 2
-                        image = image.crop((0, top, width, top + new_height))
-                        print(f"Cropped to: {width}x{new_height}")
-                
-                # Resize to exact target dimensions
-                try:
-                    # Try newer PIL version first
-                    image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                except AttributeError:
-                    # Fallback for older PIL versions
-                    image = image.resize((target_width, target_height), Image.LANCZOS)
-                print(f"Final size: {target_width}x{target_height}")
-            
-            elif height > width:
-                print(f"✅ Image is portrait: {width}x{height}")
-                # Resize to target dimensions while maintaining aspect ratio
-                target_width = settings.VIDEO_WIDTH
-                target_height = settings.VIDEO_HEIGHT
-                try:
-                    image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                except AttributeError:
-                    image = image.resize((target_width, target_height), Image.LANCZOS)
-                print(f"Resized to: {target_width}x{target_height}")
-            
-            else:
-                print(f"ℹ️  Image is square: {width}x{height}, converting to portrait...")
-                # Square image - extend height to make portrait
-                target_width = settings.VIDEO_WIDTH
-                target_height = settings.VIDEO_HEIGHT
-                try:
-                    image = image.resize((target_width, target_height), Image.Resampling.LANCZOS)
-                except AttributeError:
-                    image = image.resize((target_width, target_height), Image.LANCZOS)
-                print(f"Resized square to portrait: {target_width}x{target_height}")
-            
-            # Save the processed image
-            image.save(output_path, 'PNG', quality=95)
-            
-            # Cache the generated image
-            self.cache_manager.cache_image(enhanced_prompt, output_path)
-            
-            print(f"Image saved to: {output_path}")
-            return output_path
+                log.debug("Image is not portrait (%dx%d), cropping to portrait", width, height)
+            image = ImageOps.fit(image, target_size, method=LANCZOS, centering=(0.5, 0.5))
+            log.debug("Final size: %dx%d", *target_size)
+        
+            # Save the processed image; light compression keeps the encode cheap
+            image.save(output_path, 'PNG', compress_level=1)
+        
+        # Cache the generated image
+        self.cache_manager.cache_image(enhanced_prompt, output_path)
+        if prompt_embedding is not None:
+            self.cache_manager.cache_embedding(enhanced_prompt, prompt_embedding)
+        
+        log.debug("Image saved to: %s", output_path)
+        return output_path
+    
+    def _is_near_video_aspect(self, width: int, height: int) -> bool:
+        """Check whether an image is portrait and within 2% of the video's aspect ratio."""
+        target_aspect = self._s.VIDEO_WIDTH / self._s.VIDEO_HEIGHT
+        return height > width and abs(width / height - target_aspect) <= 0.02 * target_aspect
+    
+    def embed_text(self, text: str) -> Optional[List[float]]:
+        """
+        Get an embedding for text, reusing one already computed for the exact same text.
+        
+        Args:
+            text: Text to embed
             
+        Returns:
+            Embedding vector, or None if the request failed
+        """
+        cached_embedding = self.cache_manager.get_cached_embedding(text)
+        if cached_embedding is not None:
+            return cached_embedding
+        
+        try:
+            response = self.client.embeddings.create(model=self._s.EMBEDDING_MODEL, input=text)
+            return response.data[0].embedding
         except Exception as e:
-            print(f"Error generating image: {e}")
-            raise
+            log.warning("Prompt embedding failed, skipping near-match cache: %s", e)
+            return None
     
     def generate_speech(self, text: str, output_path: str) -> str:
         """
@@ -168,37 +204,76 @@ class OpenAIService:
             # Check cache first
             cached_audio = self.cache_manager.get_cached_audio(text)
             if cached_audio:
-                # Copy cached audio to output path
-                import shutil
-                shutil.copy2(cached_audio, output_path)
-                return output_path
+                # Link or copy cached audio to output path
+                return self.cache_manager.copy_to(cached_audio, output_path)
             
-            print(f"Generating speech: {text[:50]}...")
-            
-            response = self.client.audio.speech.create(
-                model=settings.TTS_MODEL,
-                voice=settings.TTS_VOICE,
-                input=text
-            )
-            
-            # Save the audio
-            with open(output_path, 'wb') as f:
-                f.write(response.content)
-            
-            # Cache the generated audio
-            self.cache_manager.cache_audio(text, output_path)
-            
-            print(f"Audio saved to: {output_path}")
-            return output_path
+            # A concurrent scene may already be voicing this exact text
+            return self._run_once(("speech", text), output_path, lambda: self._create_speech(text, output_path))
             
         except Exception as e:
-            print(f"Error generating speech: {e}")
+            log.error("Error generating speech: %s", e)
             raise
     
+    def _create_speech(self, text: str, output_path: str) -> str:
+        """Request new speech audio from OpenAI TTS, save it and cache it."""
+        log.info("Generating speech: %s...", text[:50])
+        
+        # Stream the audio straight to disk instead of buffering the whole MP3 first
+        with self.client.audio.speech.with_streaming_response.create(
+            model=self._s.TTS_MODEL,
+            voice=self._s.TTS_VOICE,
+            input=text,
+            response_format="mp3",
+        ) as response:
+            response.stream_to_file(output_path)
+        
+        # Cache the generated audio
+        self.cache_manager.cache_audio(text, output_path)
+        
+        log.debug("Audio saved to: %s", output_path)
+        return output_path
+    
+    def _run_once(self, key: tuple, output_path: str, create) -> str:
+        """
+        Run `create` for key unless another thread is already creating the same asset,
+        in which case wait for it and reuse its file instead of paying for a duplicate request.
+        
+        Args:
+            key: Identity of the asset, e.g. ("speech", text)
+            output_path: Where this caller needs the asset
+            create: Callable that generates the asset at output_path and returns that path
+            
+        Returns:
+            output_path
+        """
+        with self._inflight_lock:
+            inflight = self._inflight.get(key)
+            is_owner = inflight is None
+            if is_owner:
+                inflight = self._inflight[key] = Future()
+        
+        if not is_owner:
+            # Re-raises the other request's error if it failed
+            source_path = inflight.result()
+            return self.cache_manager.copy_to(source_path, output_path)
+        
+        try:
+            result = create()
+            inflight.set_result(result)
+            return result
+        except BaseException as e:
+            inflight.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    
     def optimize_image_prompt(self, scene_description: str, character_description: str) -> str:
         """
-        Use a cheap OpenAI call to create an optimized DALL-E prompt.
+        Create a focused DALL-E prompt from a scene and the character's visual style.
         Combines scene description with character info without creating montages.
+        Only unusually long scenes are condensed with a cheap OpenAI call; the rest
+        use a deterministic template, which also keeps prompts stable for the image cache.
         
         Args:
             scene_description: Description of what's happening in the scene
@@ -207,6 +282,15 @@ class OpenAIService:
         Returns:
             Optimized prompt for DALL-E
         """
+        if len(scene_description) <= 400:
+            return self._template_image_prompt(scene_description, character_description)
+        
+        # Reuse the prompt written for this scene before; a fresh one would also miss the image cache
+        prompt_source = f"{scene_description}\n{character_description}"
+        cached_prompt = self.cache_manager.get_cached_prompt(prompt_source)
+        if cached_prompt:
+            return cached_prompt
+        
         try:
             optimization_prompt = f"""Create a single, focused DALL-E prompt for ONE specific scene. Combine these elements:
 
@@ -233,37 +317,34 @@ Output only the optimized DALL-E prompt:"""
             )
             
             optimized_prompt = response.choices[0].message.content.strip()
-            print(f"🤖 AI-optimized prompt: {optimized_prompt[:80]}...")
+            log.debug("AI-optimized prompt: %s...", optimized_prompt[:80])
+            self.cache_manager.cache_prompt(prompt_source, optimized_prompt)
             return optimized_prompt
             
         except Exception as e:
-            print(f"⚠️  Prompt optimization failed, using fallback: {e}")
-            # Fallback: clean up the basic concatenation
-            fallback = f"{scene_description}. {character_description}"
-            # Remove problematic phrases that cause montages
-            fallback = fallback.replace("various situations", "this specific scene")
-            fallback = fallback.replace("different locations", "the current location")
-            fallback = fallback.replace("multiple scenes", "single scene")
-            return fallback[:500]  # Keep within DALL-E limits
+            log.warning("Prompt optimization failed, using template: %s", e)
+            return self._template_image_prompt(scene_description, character_description)
     
-    def generate_scene_assets(self, scene: Dict, scene_index: int, episode_dir: str, character_config: Dict = None) -> Dict:
+    def _template_image_prompt(self, scene_description: str, character_description: str) -> str:
+        """Join the scene and character style into one DALL-E prompt without an API call."""
+        prompt = f"{scene_description[:240]}. {character_description[:200]}"
+        # Remove problematic phrases that cause montages
+        prompt = prompt.replace("various situations", "this specific scene")
+        prompt = prompt.replace("different locations", "the current location")
+        prompt = prompt.replace("multiple scenes", "single scene")
+        return prompt[:480]  # Keep within DALL-E limits
+    
+    def _prepare_scene_paths(self, scene_index: int, episode_dir: str) -> Tuple[str, str, bool, bool]:
         """
-        Generate both image and audio for a single scene, with Whisper timing.
-        Saves assets to the episode directory instead of temp.
+        Work out where a scene's assets live and which of them are already in place.
         
         Args:
-            scene: Dictionary containing 'sceneDescription' and 'voiceoverText'
             scene_index: Index of the scene (for file naming)
             episode_dir: Episode directory to store assets (not temp)
-            character_config: Optional character configuration for channel-based generation
             
         Returns:
-            Dictionary with paths to generated image and audio files, plus timing
+            Tuple of (image_path, audio_path, image_exists, audio_exists)
         """
-        # Set channel character if provided
-        if character_config:
-            self.character_manager.set_channel_character(character_config)
-        
         # Create assets directory within episode
         assets_dir = os.path.join(episode_dir, "assets")
         os.makedirs(assets_dir, exist_ok=True)
@@ -277,47 +358,14 @@ Output only the optimized DALL-E prompt:"""
         audio_exists = os.path.exists(audio_path)
         
         if image_exists:
-            print(f"♻️  Reusing existing image: scene_{scene_index}_image.png")
-        else:
-            # Generate new image
-            self.generate_image(scene['sceneDescription'], image_path)
-            
+            log.info("Reusing existing image: scene_%d_image.png", scene_index)
         if audio_exists:
-            print(f"♻️  Reusing existing audio: scene_{scene_index}_audio.mp3")
-        else:
-            # Generate new audio
-            self.generate_speech(scene['voiceoverText'], audio_path)
-        
-        # Get Whisper timing data
-        whisper_timing = None
-        cached_timing = self.cache_manager.get_cached_whisper_timing(scene['voiceoverText'])
-        
-        if cached_timing:
-            whisper_timing = cached_timing
-        elif self.whisper_service.enabled:
-            # Get fresh Whisper timing
-            word_timings = self.whisper_service.get_word_timings(audio_path, scene['voiceoverText'])
-            
-            if word_timings and self.whisper_service.validate_transcription(word_timings, scene['voiceoverText']):
-                # Get audio duration for adjustment
-                from moviepy.editor import AudioFileClip
-                with AudioFileClip(audio_path) as audio_clip:
-                    actual_duration = audio_clip.duration
-                
-                # Adjust timings to match actual audio duration
-                adjusted_timings = self.whisper_service.adjust_timings_to_duration(word_timings, actual_duration)
-                
-                whisper_timing = {
-                    'word_timings': adjusted_timings,
-                    'duration': actual_duration,
-                    'source': 'whisper'
-                }
-                
-                # Cache the timing data
-                self.cache_manager.cache_whisper_timing(scene['voiceoverText'], whisper_timing)
-            else:
-                print("Whisper timing failed or validation failed, will use fallback timing")
+            log.info("Reusing existing audio: scene_%d_audio.mp3", scene_index)
         
+        return image_path, audio_path, image_exists, audio_exists
+    
+    def _scene_assets(self, scene: Dict, image_path: str, audio_path: str, whisper_timing: Optional[Dict]) -> Dict:
+        """Assemble the asset dictionary the video composer consumes for one scene."""
         return {
             'image_path': image_path,
             'audio_path': audio_path,
@@ -326,3 +374,96 @@ Output only the optimized DALL-E prompt:"""
             'character_info': self.character_manager.get_character_info(),
             'whisper_timing': whisper_timing
         }
+    
+    def _generate_voiceover_with_timing(self, text: str, audio_path: str, audio_exists: bool) -> Optional[Dict]:
+        """
+        Generate a scene's voiceover if needed, then get its Whisper word timings.
+        
+        Args:
+            text: Voiceover text
+            audio_path: Path of the scene's audio file
+            audio_exists: Whether the audio file is already in place
+            
+        Returns:
+            Whisper timing data, or None to use fallback timing
+        """
+        if not audio_exists:
+            # Generate new audio
+            self.generate_speech(text, audio_path)
+        
+        # Word timings only drive captions; without them there is nothing to align
+        if not self._s.ENABLE_CAPTIONS:
+            return None
+        
+        # Get Whisper timing data
+        cached_timing = self.cache_manager.get_cached_whisper_timing(text)
+        if cached_timing:
+            return cached_timing
+        
+        if not self.whisper_service.enabled:
+            return None
+        
+        # Get fresh Whisper timing
+        word_timings = self.whisper_service.get_word_timings(audio_path, text)
+        
+        if not (word_timings and self.whisper_service.validate_transcription(word_timings, text)):
+            log.info("Whisper timing failed or validation failed, will use fallback timing")
+            return None
+        
+        # Get audio duration for adjustment
+        actual_duration = _audio_duration(audio_path)
+        
+        # Adjust timings to match actual audio duration
+        adjusted_timings = self.whisper_service.adjust_timings_to_duration(word_timings, actual_duration)
+        
+        whisper_timing = {
+            'word_timings': adjusted_timings,
+            'duration': actual_duration,
+            'source': 'whisper'
+        }
+        
+        # Cache the timing data
+        self.cache_manager.cache_whisper_timing(text, whisper_timing)
+        return whisper_timing
+    
+    def generate_all_scene_assets(self, scenes: List[Dict], episode_dir: str, character_config: Dict = None) -> List[Dict]:
+        """
+        Generate assets for every scene of an episode as two independent stages.
+        Images go through one pool and voiceovers (speech, then Whisper) through another,
+        each MAX_CONCURRENT_REQUESTS // 2 wide, so a slow image never holds up the next
+        scene's voiceover and alignment.
+        
+        Args:
+            scenes: List of scene dictionaries
+            episode_dir: Episode directory to store assets (not temp)
+            character_config: Optional character configuration for channel-based generation
+            
+        Returns:
+            List of scene asset dictionaries, in scene order
+        """
+        # Set once up front; scenes running in parallel must not reconfigure the shared character
+        if character_config:
+            self.character_manager.set_channel_character(character_config)
+        
+        stage_workers = min(max(1, self._s.MAX_CONCURRENT_REQUESTS // 2), max(1, len(scenes)))
+        with ThreadPoolExecutor(max_workers=stage_workers) as image_pool, \
+             ThreadPoolExecutor(max_workers=stage_workers) as voice_pool:
+            pending = []
+            for scene_index, scene in enumerate(scenes):
+                image_path, audio_path, image_exists, audio_exists = self._prepare_scene_paths(scene_index, episode_dir)
+                
+                image_future = None
+                if not image_exists:
+                    image_future = image_pool.submit(self.generate_image, scene['sceneDescription'], image_path)
+                timing_future = voice_pool.submit(self._generate_voiceover_with_timing, scene['voiceoverText'], audio_path, audio_exists)
+                
+                pending.append((scene, image_path, audio_path, image_future, timing_future))
+            
+            # Collect in scene order; the first failure propagates
+            scene_assets_list = []
+            for scene, image_path, audio_path, image_future, timing_future in pending:
+                if image_future is not None:
+                    image_future.result()
+                scene_assets_list.append(self._scene_assets(scene, image_path, audio_path, timing_future.result()))
+            
+            return scene_assets_list
@@ -1,7 +1,15 @@
-from openai import OpenAI
-from config.settings import settings
+import logging
+from services.openai_client import get_openai_client
+from config.settings import get_settings
 from typing import List, Dict, Optional
 import os
+import string
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+# Strips all punctuation, including dashes, ellipses and curly quotes
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation + '\u2014\u2013\u2026\u2018\u2019\u201c\u201d')
 
 class WhisperService:
     """
@@ -9,9 +17,10 @@ class WhisperService:
     """
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = settings.WHISPER_MODEL
-        self.enabled = settings.ENABLE_WHISPER_TIMING
+        s = get_settings()
+        self.client = get_openai_client()
+        self.model = s.WHISPER_MODEL
+        self.enabled = s.ENABLE_WHISPER_TIMING
     
     def get_word_timings(self, audio_path: str, expected_text: str) -> Optional[List[Dict]]:
         """
@@ -28,9 +37,10 @@ class WhisperService:
             return None
             
         try:
-            print(f"Getting Whisper timings for audio: {os.path.basename(audio_path)}")
+            log.debug("Getting Whisper timings for audio: %s", os.path.basename(audio_path))
             
-            with open(audio_path, "rb") as audio_file:
+            # Read the upload in large chunks; scene audio can sit on slow or network storage
+            with open(audio_path, "rb", buffering=1 << 20) as audio_file:
                 # Use Whisper with word-level timestamps
                 response = self.client.audio.transcriptions.create(
                     model=self.model,
@@ -51,15 +61,15 @@ class WhisperService:
                         'confidence': getattr(word_data, 'confidence', 1.0)
                     })
                 
-                print(f"Whisper found {len(word_timings)} words with timings")
+                log.debug("Whisper found %d words with timings", len(word_timings))
                 return word_timings
             
             else:
-                print("Whisper response doesn't contain word-level timestamps")
+                log.info("Whisper response doesn't contain word-level timestamps")
                 return None
                 
         except Exception as e:
-            print(f"Whisper timing failed: {e}")
+            log.warning("Whisper timing failed: %s", e)
             return None
     
     def validate_transcription(self, whisper_words: List[Dict], expected_text: str) -> bool:
@@ -79,33 +89,36 @@ class WhisperService:
         # Normalize both texts for comparison
         def normalize_text(text):
             # Convert to lowercase and remove punctuation
-            import re
-            text = text.lower()
-            # Remove all punctuation including em dashes, hyphens, etc.
-            text = re.sub(r'[^\w\s]', '', text)
-            return text.split()
+            return text.lower().translate(_PUNCT_TABLE).split()
         
-        # Get normalized word lists
-        whisper_words_clean = [normalize_text(w['word'])[0] if normalize_text(w['word']) else '' 
-                              for w in whisper_words]
-        whisper_words_clean = [w for w in whisper_words_clean if w]  # Remove empty
+        # Get normalized word lists (first token of each Whisper word, skipping empties)
+        whisper_words_clean = [tokens[0] for tokens in map(normalize_text, (w['word'] for w in whisper_words))
+                               if tokens]
         
         expected_words_clean = normalize_text(expected_text)
         
-        # Simple word-by-word comparison
+        if not expected_words_clean:
+            return False
+        
+        # Count expected words Whisper also heard, stopping once enough match.
+        # Threshold is 60% to account for minor variations
+        required_matches = 0.6 * len(expected_words_clean)
+        whisper_vocabulary = set(whisper_words_clean)
         matching_words = 0
         for expected_word in expected_words_clean:
-            if expected_word in whisper_words_clean:
+            if expected_word in whisper_vocabulary:
                 matching_words += 1
+                if matching_words >= required_matches:
+                    break
         
-        similarity = matching_words / len(expected_words_clean) if expected_words_clean else 0
-        
-        print(f"Transcription similarity: {similarity:.2f}")
-        print(f"Expected: {' '.join(expected_words_clean)}")
-        print(f"Whisper:  {' '.join(whisper_words_clean)}")
+        is_match = matching_words >= required_matches
+        log.debug("Transcription %s the expected text (%d of %d words matched before deciding)",
+                  "matches" if is_match else "does not match", matching_words, len(expected_words_clean))
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Expected: %s", ' '.join(expected_words_clean))
+            log.debug("Whisper:  %s", ' '.join(whisper_words_clean))
         
-        # Lower threshold to 60% to account for minor variations
-        return similarity >= 0.6
+        return is_match
     
     def adjust_timings_to_duration(self, word_timings: List[Dict], target_duration: float) -> List[Dict]:
         """
@@ -121,8 +134,13 @@ class WhisperService:
         if not word_timings:
             return word_timings
         
+        # Scale start and end times as columns rather than word by word
+        count = len(word_timings)
+        starts = np.fromiter((w['start_time'] for w in word_timings), dtype=np.float64, count=count)
+        ends = np.fromiter((w['end_time'] for w in word_timings), dtype=np.float64, count=count)
+        
         # Get the actual duration from Whisper
-        whisper_duration = max(w['end_time'] for w in word_timings)
+        whisper_duration = float(ends.max())
         
         # If timings are close to target, use as-is
         if abs(whisper_duration - target_duration) < 0.5:
@@ -130,15 +148,19 @@ class WhisperService:
         
         # Scale timings to fit target duration
         scale_factor = target_duration / whisper_duration
+        starts *= scale_factor
+        ends *= scale_factor
         
-        adjusted_timings = []
-        for word_data in word_timings:
-            adjusted_timings.append({
+        # Repack as plain dicts; timings are cached as JSON
+        adjusted_timings = [
+            {
                 'word': word_data['word'],
-                'start_time': word_data['start_time'] * scale_factor,
-                'end_time': word_data['end_time'] * scale_factor,
+                'start_time': start,
+                'end_time': end,
                 'confidence': word_data.get('confidence', 1.0)
-            })
+            }
+            for word_data, start, end in zip(word_timings, starts.tolist(), ends.tolist())
+        ]
         
-        print(f"Adjusted Whisper timings: {whisper_duration:.2f}s → {target_duration:.2f}s (scale: {scale_factor:.2f})")
+        log.debug("Adjusted Whisper timings: %.2fs → %.2fs (scale: %.2f)", whisper_duration, target_duration, scale_factor)
         return adjusted_timings
@@ -7,11 +7,9 @@ Main orchestrator for creating narrative-driven videos from scripts.
 import os
 import sys
 import time
+import logging
 import argparse
-from datetime import datetime
-from config.settings import settings
-from services.openai_service import OpenAIService
-from video.composer import VideoComposer
+from config.settings import get_settings, override_settings
 from video.utils import ensure_directory, cleanup_directory, validate_script, get_file_size_mb
 
 def create_video(script, output_filename=None, cleanup_temp=True, character_config=None, episode_dir=None):
@@ -28,6 +26,11 @@ def create_video(script, output_filename=None, cleanup_temp=True, character_conf
     Returns:
         Path to the generated video file
     """
+    # Imported here so informational commands don't pay for the OpenAI and MoviePy stacks
+    from services.openai_service import OpenAIService
+    from video.composer import VideoComposer
+    
+    settings = get_settings()
     
     # Validate configuration
     settings.validate()
@@ -49,6 +52,7 @@ def create_video(script, output_filename=None, cleanup_temp=True, character_conf
     
     # Generate output filename if not provided
     if not output_filename:
+        from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_filename = f"synthesium_video_{timestamp}.mp4"
         output_path = os.path.join(output_dir, output_filename)
@@ -82,13 +86,9 @@ def create_video(script, output_filename=None, cleanup_temp=True, character_conf
         openai_service = OpenAIService()
         video_composer = VideoComposer()
         
-        # Generate assets for each scene
-        scene_assets_list = []
-        
-        for i, scene in enumerate(script):
-            print(f"\n📹 Processing Scene {i+1}/{len(script)}")
-            scene_assets = openai_service.generate_scene_assets(scene, i, work_dir, character_config)
-            scene_assets_list.append(scene_assets)
+        # Generate assets for all scenes, several at a time
+        print(f"\n📹 Processing {len(script)} scenes")
+        scene_assets_list = openai_service.generate_all_scene_assets(script, work_dir, character_config)
         
         # Create the final video
         print(f"\n🎞️ Assembling final video...")
@@ -134,14 +134,22 @@ def main():
     parser.add_argument('--regenerate-images', action='store_true', help='Force regenerate all images')
     parser.add_argument('--regenerate-audio', action='store_true', help='Force regenerate all audio')
     parser.add_argument('--regenerate-all', action='store_true', help='Force regenerate everything')
-    parser.add_argument('--clear-cache', choices=['images', 'audio', 'whisper', 'all'], help='Clear cache')
+    parser.add_argument('--clear-cache', choices=['images', 'audio', 'whisper', 'scenes', 'all'], help='Clear cache')
     parser.add_argument('--cache-stats', action='store_true', help='Show cache statistics')
     parser.add_argument('--music-info', action='store_true', help='Show background music information')
     parser.add_argument('--channel', type=str, help='Generate video for specific channel')
     parser.add_argument('--list-channels', action='store_true', help='List available channels')
     parser.add_argument('--channel-stats', type=str, help='Show stats for specific channel')
+    parser.add_argument('--verbose', action='store_true', help='Show detailed service logging')
     args = parser.parse_args()
     
+    # Service diagnostics are logged at DEBUG and only shown with --verbose; third-party
+    # libraries (openai, httpx, PIL, numba) stay at INFO so their request traces don't flood the output
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    if args.verbose:
+        for package in ('services', 'video', 'config'):
+            logging.getLogger(package).setLevel(logging.DEBUG)
+    
     # Handle cache clearing
     if args.clear_cache:
         from services.cache_manager import CacheManager
@@ -158,6 +166,7 @@ def main():
         print(f"Images cached: {stats['images_cached']}")
         print(f"Audio cached: {stats['audio_cached']}")
         print(f"Whisper timings cached: {stats['whisper_cached']}")
+        print(f"Scene renders cached: {stats['scenes_cached']}")
         print(f"Cache enabled: {stats['cache_enabled']}")
         return 0
     
@@ -213,11 +222,11 @@ def main():
     
     # Override settings based on arguments
     if args.regenerate_images or args.regenerate_all:
-        settings.FORCE_REGENERATE_IMAGES = True
+        override_settings(FORCE_REGENERATE_IMAGES=True)
         print("🔄 Force regenerating images")
     
     if args.regenerate_audio or args.regenerate_all:
-        settings.FORCE_REGENERATE_AUDIO = True
+        override_settings(FORCE_REGENERATE_AUDIO=True)
         print("🔄 Force regenerating audio")
     
     # Generate script based on mode (channel vs manual)
@@ -286,6 +295,11 @@ def main():
         print(f"\n💥 Failed to create video: {e}")
         return 1
     
+    finally:
+        if args.channel:
+            # The episode's script.json is written in the background while the video renders
+            channel_manager.flush_writes()
+    
     return 0
 
 if __name__ == "__main__":
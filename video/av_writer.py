@@ -0,0 +1,59 @@
+"""
+In-process H.264 encoder for rendered scenes. Needs PyAV; without it `write_frames` is None
+and the composer encodes through MoviePy's ffmpeg pipe instead.
+"""
+from fractions import Fraction
+from typing import Dict, Iterable, Optional
+import numpy as np
+
+try:
+    import av
+except ImportError:  # Optional encoder
+    av = None
+
+if av is not None:
+    def write_frames(frames: Iterable[np.ndarray], output_path: str, fps: int, width: int, height: int,
+                     codec: str = 'libx264', options: Optional[Dict[str, str]] = None,
+                     audio_path: Optional[str] = None):
+        """
+        Encode RGB frames to a video file, muxing in an already-encoded audio track.
+
+        Args:
+            frames: uint8 arrays of shape (height, width, 3), in display order
+            output_path: Where the video is written; the container follows the extension
+            fps: Frame rate of `frames`
+            width, height: Frame size in pixels
+            codec: FFmpeg encoder name
+            options: Encoder options, as for ffmpeg's -<option> flags
+            audio_path: Audio file whose first audio stream is copied in without re-encoding
+        """
+        with av.open(output_path, 'w') as container:
+            stream = container.add_stream(codec, rate=fps)
+            stream.width = width
+            stream.height = height
+            stream.pix_fmt = 'yuv420p'
+            if options:
+                stream.options = options
+
+            if audio_path:
+                # Audio is small next to video, so copy all of it up front and let the muxer interleave
+                with av.open(audio_path) as audio_input:
+                    audio_in = audio_input.streams.audio[0]
+                    audio_out = container.add_stream_from_template(audio_in)
+                    for packet in audio_input.demux(audio_in):
+                        if packet.dts is None:
+                            continue
+                        packet.stream = audio_out
+                        container.mux(packet)
+
+            time_base = Fraction(1, fps)
+            for index, frame_array in enumerate(frames):
+                frame = av.VideoFrame.from_ndarray(frame_array, format='rgb24')
+                frame.pts = index
+                frame.time_base = time_base
+                container.mux(stream.encode(frame))
+
+            # Drain frames the encoder is still holding
+            container.mux(stream.encode())
+else:
+    write_frames = None
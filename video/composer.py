@@ -1,42 +1,206 @@
+import json
+import multiprocessing
 import os
-import random
-from moviepy.editor import *
-from config.settings import settings
+import platform
+import shutil
+import subprocess
+import tempfile
+import zlib
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+# Only the clip classes used here; moviepy.editor would also load every effect, preview and text tool
+from moviepy.audio.io.AudioFileClip import AudioFileClip
+from moviepy.config import get_setting
+from moviepy.video.VideoClip import ImageClip, VideoClip
+from moviepy.video.fx.resize import resize
+from moviepy.video.io.VideoFileClip import VideoFileClip
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from config.settings import get_settings
 from services.caption_service import CaptionService
-from services.audio_manager import AudioManager
-from typing import List, Dict
+from services.audio_manager import AudioManager, close_music_clips
+from services.cache_manager import CacheManager
+from video.ken_burns import render_crop, render_crop_gpu, sampler_name, upload_frame
+from video.av_writer import write_frames
+from video import render_worker
+from typing import Callable, List, Dict, Optional, Tuple
+
+# Pillow 9.1 moved the filters under Image.Resampling
+_resampling = getattr(Image, "Resampling", Image)
+BILINEAR, LANCZOS = _resampling.BILINEAR, _resampling.LANCZOS
+
+# Hardware H.264 encoders in order of preference, with the check that the device is actually there
+_HARDWARE_ENCODERS = (
+    ('h264_videotoolbox', lambda: platform.system() == 'Darwin'),
+    ('h264_nvenc', lambda: os.path.exists('/dev/nvidia0')),
+    ('h264_qsv', lambda: os.path.exists('/dev/dri/renderD128') and 'intel' in platform.processor().lower()),
+)
+
+@lru_cache(maxsize=1)
+def _detect_h264_encoder() -> str:
+    """Pick the fastest H.264 encoder this ffmpeg build and machine support, falling back to libx264."""
+    try:
+        result = subprocess.run([get_setting("FFMPEG_BINARY"), '-hide_banner', '-encoders'],
+                                capture_output=True, text=True, timeout=10)
+        available = result.stdout
+    except (OSError, subprocess.SubprocessError):
+        return 'libx264'
+    
+    for encoder, device_present in _HARDWARE_ENCODERS:
+        if f" {encoder} " in available and device_present():
+            return encoder
+    return 'libx264'
+
+@lru_cache(maxsize=32)
+def _load_font(font: str, fallback_font: str, fontsize: int) -> ImageFont.ImageFont:
+    """Load a caption font once, falling back to the fallback font and then Pillow's built-in one."""
+    for name in (font, fallback_font):
+        try:
+            return ImageFont.truetype(name, fontsize)
+        except OSError as e:
+            print(f"Font {name} failed, using fallback: {e}")
+    try:
+        return ImageFont.load_default(size=fontsize)
+    except TypeError:  # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=2048)
+def _render_word(word: str, fontsize: int, color: str, stroke_color: str, stroke_width: int,
+                 font: str, fallback_font: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rasterize a caption word with Pillow, once per style; repeated words reuse the pixels.
+    
+    Returns:
+        Tuple of (RGB frame, alpha mask), both uint8 and read-only
+    """
+    image_font = _load_font(font, fallback_font, fontsize)
+    left, top, right, bottom = image_font.getbbox(word, stroke_width=stroke_width)
+    image = Image.new("RGBA", (max(1, right - left), max(1, bottom - top)), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((-left, -top), word, font=image_font, fill=color,
+                               stroke_width=stroke_width, stroke_fill=stroke_color)
+    
+    pixels = np.asarray(image)
+    rgb = np.ascontiguousarray(pixels[:, :, :3])
+    mask = np.ascontiguousarray(pixels[:, :, 3])
+    # Renders are shared through the cache, so keep the buffers read-only
+    rgb.flags.writeable = False
+    mask.flags.writeable = False
+    return rgb, mask
+
+# Crop boxes for each camera movement: (progress 0-1, frame width, frame height, zoom factor at
+# the tight end of a zoom, pan distance in pixels of an image widened by that amount)
+# -> (left, top, right, bottom) in image pixels of the part of the frame-sized image on screen
+
+def _zoom_box(current_zoom: float, width: int, height: int) -> Tuple[float, float, float, float]:
+    """Centred crop box at a zoom level."""
+    crop_width, crop_height = width / current_zoom, height / current_zoom
+    left = (width - crop_width) / 2
+    top = (height - crop_height) / 2
+    return (left, top, left + crop_width, top + crop_height)
+
+def _zoom_in_box(progress: float, width: int, height: int, zoom_factor: float, pan_pixels: int) -> Tuple[float, float, float, float]:
+    # Start normal, zoom in over time
+    return _zoom_box(1 + (zoom_factor - 1) * progress, width, height)
+
+def _zoom_out_box(progress: float, width: int, height: int, zoom_factor: float, pan_pixels: int) -> Tuple[float, float, float, float]:
+    # Start zoomed in, zoom out over time
+    return _zoom_box(zoom_factor - (zoom_factor - 1) * progress, width, height)
+
+def _zoom_in_pan_box(progress: float, width: int, height: int, zoom_factor: float, pan_pixels: int) -> Tuple[float, float, float, float]:
+    current_zoom = 1 + (zoom_factor - 1) * progress
+    left, top, right, bottom = _zoom_box(current_zoom, width, height)
+    crop_width = right - left
+    # Gentler pan when zooming, kept inside the image
+    left = min(width - crop_width, left + pan_pixels * 0.3 * progress / current_zoom)
+    return (left, top, left + crop_width, bottom)
+
+def _pan_box(x_offset: float, width: int, height: int, pan_pixels: int) -> Tuple[float, float, float, float]:
+    """Frame-wide window at x_offset across the image, as if it were pan_pixels wider."""
+    scale = width / (width + pan_pixels)
+    left = x_offset * scale
+    return (left, 0, left + width * scale, height)
+
+def _pan_left_box(progress: float, width: int, height: int, zoom_factor: float, pan_pixels: int) -> Tuple[float, float, float, float]:
+    return _pan_box(pan_pixels * progress, width, height, pan_pixels)
+
+def _pan_right_box(progress: float, width: int, height: int, zoom_factor: float, pan_pixels: int) -> Tuple[float, float, float, float]:
+    return _pan_box(pan_pixels * (1 - progress), width, height, pan_pixels)
+
+# Bump when a change to scene rendering should invalidate previously cached scene videos
+_SCENE_RENDER_VERSION = 2
+
+# Looked up once per clip, so frames don't re-test the movement name
+_MOVEMENT_BOXES = {
+    'zoom_in': _zoom_in_box,
+    'zoom_out': _zoom_out_box,
+    'pan_left': _pan_left_box,
+    'pan_right': _pan_right_box,
+    'zoom_in_pan': _zoom_in_pan_box,
+}
 
 class VideoComposer:
-    def __init__(self):
-        self.fps = settings.VIDEO_FPS
-        self.width = settings.VIDEO_WIDTH
-        self.height = settings.VIDEO_HEIGHT
-        self.enable_movement = settings.ENABLE_CAMERA_MOVEMENT
-        self.zoom_intensity = settings.ZOOM_INTENSITY
-        self.pan_intensity = settings.PAN_INTENSITY
+    def __init__(self, threads: int = None):
+        """
+        Args:
+            threads: Encoder threads per output; None lets the encoder decide
+        """
+        s = get_settings()
+        self.threads = threads
+        self.fps = s.VIDEO_FPS
+        self.width = s.VIDEO_WIDTH
+        self.height = s.VIDEO_HEIGHT
+        self.enable_movement = s.ENABLE_CAMERA_MOVEMENT
+        self.zoom_intensity = s.ZOOM_INTENSITY
+        self.pan_intensity = s.PAN_INTENSITY
+        self.codec = _detect_h264_encoder() if s.VIDEO_CODEC == "auto" else s.VIDEO_CODEC
         self.caption_service = CaptionService()
         self.audio_manager = AudioManager()
+        self.cache_manager = CacheManager()
+    
+    def _load_frame_image(self, image_path: str) -> np.ndarray:
+        """Decode an image as RGB, resized to the video frame only if it isn't already that size."""
+        with Image.open(image_path) as image:
+            image = image.convert('RGB')
+            if image.size != (self.width, self.height):
+                image = image.resize((self.width, self.height), LANCZOS)
+            return np.asarray(image)
     
-    def apply_camera_movement(self, image_clip: ImageClip, duration: float) -> VideoClip:
+    def apply_camera_movement(self, image_clip: ImageClip, duration: float,
+                              rng: np.random.Generator = None) -> VideoClip:
         """
         Apply Ken Burns effect (zoom and pan) to an image clip.
         
         Args:
             image_clip: The image clip to apply movement to
             duration: Duration of the clip in seconds
+            rng: Generator used to pick the movement; unseeded if not given
             
         Returns:
-            VideoClip with camera movement applied
+            VideoClip with camera movement applied. Its frames may share one buffer,
+            so a frame is only valid until the next one is requested
         """
         if not self.enable_movement:
             return image_clip
         
         # Choose random movement type
-        movement_types = ['zoom_in', 'zoom_out', 'pan_left', 'pan_right', 'zoom_in_pan']
-        movement = random.choice(movement_types)
+        if rng is None:
+            rng = np.random.default_rng()
+        movement_types = list(_MOVEMENT_BOXES)
+        movement = movement_types[rng.integers(len(movement_types))]
+        movement_box = _MOVEMENT_BOXES[movement]
         
-        # Ensure image is properly sized before applying movement
-        base_clip = image_clip.resize(newsize=(self.width, self.height))
+        # Decode the frame-sized image once; every frame is a crop of it scaled back to the frame
+        if tuple(image_clip.size) != (self.width, self.height):
+            image_clip = image_clip.fx(resize, newsize=(self.width, self.height))
+        base_frame = np.ascontiguousarray(image_clip.get_frame(0), dtype=np.uint8)
+        base_image = Image.fromarray(base_frame)
+        gpu_base = upload_frame(base_frame)
+        width, height = self.width, self.height
+        frame_size = (width, height)
+        frame_shape = (self.height, self.width) + base_frame.shape[2:]
+        # Frames are encoded one at a time, so the samplers all write into the same buffer
+        out = np.empty(frame_shape, dtype=np.uint8)
         
         # Calculate movement parameters
         zoom_factor = 1 + self.zoom_intensity
@@ -45,44 +209,18 @@ class VideoComposer:
         def make_frame(t):
             # Normalize time (0 to 1)
             progress = t / duration
-            
-            if movement == 'zoom_in':
-                # Start normal, zoom in over time
-                current_zoom = 1 + (zoom_factor - 1) * progress
-                return base_clip.resize(current_zoom).get_frame(t)
-            
-            elif movement == 'zoom_out':
-                # Start zoomed in, zoom out over time
-                current_zoom = zoom_factor - (zoom_factor - 1) * progress
-                return base_clip.resize(current_zoom).get_frame(t)
-            
-            elif movement == 'pan_left':
-                # Pan from right to left
-                x_offset = pan_pixels * progress
-                # Create larger canvas and crop to simulate panning
-                expanded_clip = base_clip.resize((self.width + pan_pixels, self.height))
-                return expanded_clip.crop(x1=x_offset, x2=x_offset + self.width).get_frame(t)
-            
-            elif movement == 'pan_right':
-                # Pan from left to right  
-                x_offset = pan_pixels * (1 - progress)
-                # Create larger canvas and crop to simulate panning
-                expanded_clip = base_clip.resize((self.width + pan_pixels, self.height))
-                return expanded_clip.crop(x1=x_offset, x2=x_offset + self.width).get_frame(t)
-            
-            elif movement == 'zoom_in_pan':
-                # Zoom in while panning slightly
-                current_zoom = 1 + (zoom_factor - 1) * progress
-                x_offset = (pan_pixels * 0.3) * progress  # Gentler pan when zooming
-                zoomed_clip = base_clip.resize(current_zoom)
-                if x_offset > 0:
-                    expanded_clip = zoomed_clip.resize((self.width + int(pan_pixels * 0.3), self.height))
-                    return expanded_clip.crop(x1=x_offset, x2=x_offset + self.width).get_frame(t)
-                else:
-                    return zoomed_clip.get_frame(t)
-            
-            # Fallback: no movement
-            return base_clip.get_frame(t)
+            box = movement_box(progress, width, height, zoom_factor, pan_pixels)
+            if gpu_base is not None:
+                # Image stays on the GPU; only the finished frame comes back
+                left, top, right, bottom = box
+                return render_crop_gpu(gpu_base, out, left, top, right - left, bottom - top)
+            if render_crop is not None:
+                # Compiled, multi-threaded sampler
+                left, top, right, bottom = box
+                render_crop(base_frame, out, left, top, right - left, bottom - top)
+                return out
+            # Crop and resize in a single resample
+            return np.asarray(base_image.resize(frame_size, BILINEAR, box=box))
         
         # Create the animated clip
         animated_clip = VideoClip(make_frame, duration=duration).set_fps(self.fps)
@@ -90,17 +228,18 @@ class VideoComposer:
         print(f"Applied camera movement: {movement}")
         return animated_clip
     
-    def create_caption_clip(self, text: str, duration: float, whisper_timing: Dict = None) -> VideoClip:
+    def create_caption_overlay(self, text: str, duration: float, whisper_timing: Dict = None) -> Optional[Callable]:
         """
-        Create a caption clip with single word pop animation using Whisper timing.
+        Create a caption burner with single word pop animation using Whisper timing.
         
         Args:
             text: Text to be displayed as captions
-            duration: Duration of the caption clip
+            duration: Duration of the scene
             whisper_timing: Optional Whisper timing data
             
         Returns:
-            VideoClip with animated captions
+            Function (frame, t) -> frame that draws the words on screen at t over the frame,
+            or None if there are no captions
         """
         if not self.caption_service.enabled:
             return None
@@ -114,53 +253,79 @@ class VideoComposer:
         word_timings = caption_data['word_timings']
         style = caption_data['style']
         
-        # Create individual text clips for each word
-        text_clips = []
+        # Blend terms and placement per distinct word; each occurrence is a timed reference to them
+        word_layers = {}
+        # Words in on-screen order: (start, end, layer)
+        shown = []
         
-        for word_timing in word_timings:
-            word = word_timing['word']
-            start_time = word_timing['start_time']
-            end_time = word_timing['end_time']
-            word_duration = end_time - start_time
-            
+        for word, start_time, end_time in zip(word_timings.words, word_timings.starts.tolist(), word_timings.ends.tolist()):
             if word.strip():  # Skip empty words
-                try:
-                    # Create text clip for this word
-                    text_clip = TextClip(
-                        word,
-                        fontsize=style['fontsize'],
-                        color=style['color'],
-                        stroke_color=style['stroke_color'],
-                        stroke_width=style['stroke_width'],
-                        font=style['font'],
-                        method='caption'
-                    ).set_position('center').set_start(start_time).set_duration(word_duration)
-                    
-                    text_clips.append(text_clip)
-                    
-                except Exception as e:
-                    # Fallback to default font if Montserrat fails
-                    print(f"Font {style['font']} failed, using fallback: {e}")
-                    text_clip = TextClip(
-                        word,
-                        fontsize=style['fontsize'],
-                        color=style['color'],
-                        stroke_color=style['stroke_color'],
-                        stroke_width=style['stroke_width'],
-                        font=self.caption_service.font_fallback,
-                        method='caption'
-                    ).set_position('center').set_start(start_time).set_duration(word_duration)
-                    
-                    text_clips.append(text_clip)
-        
-        if text_clips:
-            # Composite all word clips
-            caption_clip = CompositeVideoClip(text_clips, size=(self.width, self.height)).set_duration(duration)
-            timing_source = "Whisper" if whisper_timing else "fallback"
-            print(f"Created caption clip with {len(text_clips)} words using {timing_source} timing")
-            return caption_clip
-        else:
+                layer = word_layers.get(word)
+                if layer is None:
+                    # Rasterize this word (or reuse an earlier render of it)
+                    rgb, mask = _render_word(word, style['fontsize'], style['color'], style['stroke_color'],
+                                             style['stroke_width'], style['font'], self.caption_service.font_fallback)
+                    layer = word_layers[word] = self._caption_layer(rgb, mask)
+                shown.append((start_time, end_time, layer))
+        
+        if not shown:
             return None
+        
+        # Later words draw over earlier ones, as stacked clips would
+        shown.sort(key=lambda item: item[0])
+        starts = [start for start, _, _ in shown]
+        longest = max(end - start for start, end, _ in shown)
+        
+        def burn(frame, t):
+            # Only words starting within one word-length before t can be on screen
+            first = bisect_left(starts, t - longest)
+            last = bisect_right(starts, t)
+            for start, end, (y_slice, x_slice, keep, ink) in shown[first:last]:
+                if t < end:
+                    if not frame.flags.writeable:
+                        frame = frame.copy()
+                    region = frame[y_slice, x_slice]
+                    # alpha * word + (255 - alpha) * background, divided by 255 with rounding, in 16 bits
+                    blended = region * keep
+                    blended += ink
+                    blended += blended >> 8
+                    region[...] = blended >> 8
+            return frame
+        
+        timing_source = "Whisper" if whisper_timing else "fallback"
+        print(f"Created caption overlay with {len(shown)} words using {timing_source} timing")
+        return burn
+    
+    def _caption_layer(self, rgb: np.ndarray, mask: np.ndarray) -> Tuple[slice, slice, np.ndarray, np.ndarray]:
+        """
+        Precompute how a rasterized word is blended at the centre of the frame.
+        
+        Returns:
+            Tuple of (row slice, column slice, background weight, premultiplied word colour),
+            the weights as uint16 in 0-255 alpha units, cropped to the frame when the word is larger than it
+        """
+        height, width = mask.shape
+        top = (self.height - height) // 2
+        left = (self.width - width) // 2
+        # Rows/columns of the word that land inside the frame
+        word_rows = slice(max(0, -top), min(height, self.height - top))
+        word_cols = slice(max(0, -left), min(width, self.width - left))
+        
+        alpha = mask[word_rows, word_cols, np.newaxis].astype(np.uint16)
+        keep = 255 - alpha
+        ink = rgb[word_rows, word_cols] * alpha + 128  # +128 rounds the division by 255
+        frame_rows = slice(top + word_rows.start, top + word_rows.stop)
+        frame_cols = slice(left + word_cols.start, left + word_cols.stop)
+        return frame_rows, frame_cols, keep, ink
+    
+    @staticmethod
+    def _scene_rng(scene_assets: Dict, duration: float) -> np.random.Generator:
+        """
+        Generator seeded from the scene's image and duration, so a scene gets the same
+        music and camera movement whichever process renders it and however often it is re-rendered.
+        """
+        key = f"{scene_assets['image_path']}:{int(duration * 1000)}"
+        return np.random.default_rng(zlib.crc32(key.encode('utf-8')))
     
     def create_scene_clip(self, scene_assets: Dict) -> VideoClip:
         """
@@ -178,32 +343,33 @@ class VideoComposer:
             duration = audio_clip.duration
             
             # Select and mix background music
-            background_track = self.audio_manager.select_background_track(scene_assets.get('scene_description'))
+            rng = self._scene_rng(scene_assets, duration)
+            background_track = self.audio_manager.select_background_track(scene_assets.get('scene_description'), rng)
             mixed_audio = self.audio_manager.mix_audio(audio_clip, background_track)
             
-            # Load image and ensure consistent portrait orientation
-            image_clip = ImageClip(scene_assets['image_path']).set_duration(duration)
-            
-            # Force resize to portrait dimensions (crop if needed to maintain aspect ratio)
-            image_clip = image_clip.resize(newsize=(self.width, self.height))
+            # Load image at portrait dimensions, decoding and resizing it once
+            image = self._load_frame_image(scene_assets['image_path'])
+            # Every frame of a still clip is this array, so captions must draw on a copy
+            image.flags.writeable = False
+            image_clip = ImageClip(image).set_duration(duration)
             
             # Apply camera movement (Ken Burns effect)
             if self.enable_movement:
-                video_clip = self.apply_camera_movement(image_clip, duration)
+                video_clip = self.apply_camera_movement(image_clip, duration, rng)
             else:
                 video_clip = image_clip
             
             # Create captions with Whisper timing if available
-            caption_clip = self.create_caption_clip(
+            burn_captions = self.create_caption_overlay(
                 scene_assets['voiceover_text'], 
                 duration, 
                 scene_assets.get('whisper_timing')
             )
             
             # Combine video, audio, and captions
-            if caption_clip:
-                # Composite video with captions
-                final_clip = CompositeVideoClip([video_clip, caption_clip], size=(self.width, self.height))
+            if burn_captions:
+                # Draw the words straight onto each frame rather than compositing clip layers
+                final_clip = video_clip.fl(lambda get_frame, t: burn_captions(get_frame(t), t))
                 scene_clip = final_clip.set_audio(mixed_audio)
                 music_status = "with music" if background_track else "no music"
                 print(f"Created scene clip with captions and {music_status} - Duration: {duration:.2f}s")
@@ -231,64 +397,284 @@ class VideoComposer:
             Path to the saved video file
         """
         try:
-            print(f"Creating video with {len(scene_assets_list)} scenes...")
-            
-            # Create clips for each scene
-            clips = []
-            for i, scene_assets in enumerate(scene_assets_list):
-                print(f"Processing scene {i+1}/{len(scene_assets_list)}")
-                clip = self.create_scene_clip(scene_assets)
-                clips.append(clip)
+            scene_count = len(scene_assets_list)
+            print(f"Creating video with {scene_count} scenes...")
             
-            # Concatenate all clips
-            if len(clips) == 1:
-                final_video = clips[0]
+            if scene_count == 1 and self._scenes_are_static():
+                # Nothing to join; encode the one scene straight to the output
+                self._render_scene(0, scene_assets_list[0], output_path)
+            elif scene_count == 1:
+                # Nothing to join; render the one scene straight to the output
+                print("Processing scene 1/1")
+                render_key = self._scene_render_key(scene_assets_list[0])
+                if self._reuse_scene(render_key, output_path):
+                    print("♻️  Reusing rendered scene 1")
+                else:
+                    clip = self.create_scene_clip(scene_assets_list[0])
+                    print(f"Rendering final video to: {output_path}")
+                    print("🎥 Starting video render...")
+                    try:
+                        self._render_with_progress(clip, output_path)
+                    finally:
+                        clip.close()
+                    self.cache_manager.cache_scene(render_key, output_path)
             else:
-                final_video = concatenate_videoclips(clips, method="compose")
-            
-            # Write the final video with progress indicator
-            print(f"Rendering final video to: {output_path}")
-            print("🎥 Starting video render...")
-            
-            try:
-                # Try with progress bar enabled (default MoviePy behavior)
-                final_video.write_videofile(
-                    output_path,
-                    fps=self.fps,
-                    codec='libx264',
-                    audio_codec='aac',
-                    temp_audiofile='temp-audio.m4a',
-                    remove_temp=True,
-                    verbose=True,  # Enable verbose output for progress
-                    logger='bar'   # Use progress bar logger
-                )
-            except Exception as e:
-                # Fallback with minimal output
-                print(f"⚠️  Progress indicator failed, using quiet mode: {e}")
-                final_video.write_videofile(
-                    output_path,
-                    fps=self.fps,
-                    codec='libx264',
-                    audio_codec='aac',
-                    temp_audiofile='temp-audio.m4a',
-                    remove_temp=True,
-                    verbose=False,
-                    logger=None
-                )
+                # Build and encode every scene to its own file in parallel, then join
+                # the files with ffmpeg's concat demuxer, which copies streams without re-encoding
+                # Scene files go in their own directory, so a crashed render never leaves
+                # a stray .mp4 next to the output that looks like a finished video
+                scene_dir = tempfile.mkdtemp(prefix=".scenes-", dir=os.path.dirname(os.path.abspath(output_path)))
+                scene_paths = [os.path.join(scene_dir, f"scene{i:02d}.mp4") for i in range(scene_count)]
+                
+                print(f"🎥 Rendering {scene_count} scenes in parallel...")
+                try:
+                    # Scene building is CPU-bound Python, so each worker is its own process.
+                    # Workers share the cores between them, since the sampler and encoder are
+                    # multithreaded too, and are spawned fresh rather than forked from a parent
+                    # that has client and I/O pool threads running
+                    cpu_count = os.cpu_count() or 1
+                    workers = min(scene_count, cpu_count)
+                    with ProcessPoolExecutor(max_workers=workers,
+                                             mp_context=multiprocessing.get_context("spawn"),
+                                             initializer=render_worker.init_worker,
+                                             initargs=(render_worker.settings_values(), max(1, cpu_count // workers))) as executor:
+                        list(executor.map(render_worker.render_scene, range(scene_count), scene_assets_list, scene_paths))
+                    
+                    print(f"Joining scenes into final video: {output_path}")
+                    # A previous one-scene output may be a hardlink into the scene cache; don't write through it
+                    if os.path.exists(output_path):
+                        os.remove(output_path)
+                    self._concat_files(scene_paths, output_path)
+                finally:
+                    shutil.rmtree(scene_dir, ignore_errors=True)
             
             print("✅ Video rendering complete!")
-            
-            # Clean up clips
-            for clip in clips:
-                clip.close()
-            final_video.close()
-            
             print(f"Video saved successfully: {output_path}")
             return output_path
             
         except Exception as e:
             print(f"Error creating video: {e}")
             raise
+        finally:
+            # Scenes rendered here read music through this thread's cached decoders
+            close_music_clips()
+    
+    def _render_clip(self, clip: VideoClip, output_path: str, logger=None):
+        """Encode a clip to H.264/AAC, keeping MoviePy's temporary audio next to the output."""
+        if write_frames is not None:
+            self._encode_clip(clip, output_path, logger)
+            return
+        clip.write_videofile(
+            output_path,
+            fps=self.fps,
+            codec=self.codec,
+            audio_codec='aac',
+            temp_audiofile=f"{output_path}.temp-audio.m4a",
+            remove_temp=True,
+            ffmpeg_params=self._codec_params(),
+            verbose=logger is not None,
+            logger=logger
+        )
+    
+    def _codec_params(self, still_image: bool = False) -> List[str]:
+        """Encoder options for the selected codec; hardware encoders default to a low bitrate."""
+        params = [] if self.threads is None else ['-threads', str(self.threads)]
+        if self.codec == 'libx264':
+            return params + (['-tune', 'stillimage', '-preset', 'veryfast'] if still_image else [])
+        return params + ['-b:v', '5M']
+    
+    def _encode_clip(self, clip: VideoClip, output_path: str, logger=None):
+        """
+        Encode a clip in-process with PyAV, handing frames straight to the encoder
+        instead of piping them to an ffmpeg subprocess. The audio is encoded once
+        to AAC and copied into the container.
+        
+        Args:
+            clip: Clip to encode
+            output_path: Where the video is written
+            logger: MoviePy/proglog logger for frame progress ('bar' for a progress bar)
+        """
+        temp_audio_path = f"{output_path}.temp-audio.m4a"
+        try:
+            if clip.audio is not None:
+                clip.audio.write_audiofile(temp_audio_path, fps=44100, codec='aac', verbose=False, logger=None)
+            options = {} if self.codec == 'libx264' else {'b': '5M'}
+            if self.threads is not None:
+                options['threads'] = str(self.threads)
+            write_frames(
+                clip.iter_frames(fps=self.fps, dtype='uint8', logger=logger),
+                output_path, self.fps, self.width, self.height,
+                codec=self.codec, options=options,
+                audio_path=temp_audio_path if clip.audio is not None else None
+            )
+        finally:
+            if os.path.exists(temp_audio_path):
+                os.remove(temp_audio_path)
+    
+    def _render_with_progress(self, clip: VideoClip, output_path: str):
+        """Render a clip with MoviePy's progress bar, falling back to quiet mode."""
+        try:
+            # Try with progress bar enabled (default MoviePy behavior)
+            self._render_clip(clip, output_path, logger='bar')
+        except Exception as e:
+            # Fallback with minimal output
+            print(f"⚠️  Progress indicator failed, using quiet mode: {e}")
+            self._render_clip(clip, output_path)
+    
+    def _render_scene(self, index: int, scene_assets: Dict, output_path: str) -> str:
+        """
+        Build one scene's clip and encode it to its own file.
+        
+        Args:
+            index: Scene index, for progress output
+            scene_assets: Scene asset dictionary
+            output_path: Where the scene's video is written
+            
+        Returns:
+            output_path
+        """
+        print(f"Processing scene {index+1}")
+        render_key = self._scene_render_key(scene_assets)
+        if self._reuse_scene(render_key, output_path):
+            print(f"♻️  Reusing rendered scene {index+1}")
+            return output_path
+        
+        if self._scenes_are_static():
+            self._encode_static_scene(scene_assets, output_path)
+        else:
+            clip = self.create_scene_clip(scene_assets)
+            try:
+                self._render_clip(clip, output_path)
+            finally:
+                clip.close()
+        self.cache_manager.cache_scene(render_key, output_path)
+        print(f"✅ Scene {index+1} rendered")
+        return output_path
+    
+    def _scene_render_key(self, scene_assets: Dict) -> str:
+        """
+        Describe everything a scene's rendered video depends on, for the scene cache.
+        Input files are identified by path, size and modification time; the music and camera
+        movement are picked from a generator seeded by the image path and voiceover duration,
+        so they are covered by the inputs. The encoder and frame sampler in use are part of
+        the key too; bump _SCENE_RENDER_VERSION for any other change to how scenes are rendered.
+        
+        Args:
+            scene_assets: Scene asset dictionary
+            
+        Returns:
+            Canonical JSON text of the scene's inputs and render settings
+        """
+        inputs = []
+        for path in (scene_assets['image_path'], scene_assets['audio_path'], *self.audio_manager.available_tracks):
+            stat = os.stat(path)
+            inputs.append([path, stat.st_size, stat.st_mtime_ns])
+        
+        captions = self.caption_service
+        music = self.audio_manager
+        return json.dumps({
+            'version': _SCENE_RENDER_VERSION,
+            'inputs': inputs,
+            'scene_description': scene_assets.get('scene_description'),
+            'voiceover_text': scene_assets['voiceover_text'],
+            'whisper_timing': scene_assets.get('whisper_timing'),
+            'video': [self.width, self.height, self.fps, self.codec],
+            # Scenes are joined by stream copy, so a reused render must come from the same pipeline
+            'pipeline': ['pyav' if write_frames is not None else 'moviepy', sampler_name()],
+            'movement': [self.enable_movement, self.zoom_intensity, self.pan_intensity],
+            'captions': [captions.enabled, captions.display_mode, captions.font, captions.font_fallback,
+                         captions.font_size, captions.font_color, captions.stroke_color, captions.stroke_width,
+                         captions.word_duration, captions.transition_gap],
+            'music': [music.enabled, music.music_volume, music.voiceover_volume, music.fade_duration],
+        }, sort_keys=True, default=str)
+    
+    def _reuse_scene(self, render_key: str, output_path: str) -> bool:
+        """
+        Place a cached render of a scene at output_path if there is one. Otherwise clear
+        output_path, which may be a hardlink into the scene cache that rendering would write through.
+        
+        Args:
+            render_key: Key from _scene_render_key
+            output_path: Where the scene's video is wanted
+            
+        Returns:
+            True if a cached render was reused
+        """
+        cached_scene = self.cache_manager.get_cached_scene(render_key)
+        if cached_scene:
+            self.cache_manager.copy_to(cached_scene, output_path)
+            return True
+        
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        return False
+    
+    def _scenes_are_static(self) -> bool:
+        """Whether scenes are a still image under audio, with no camera movement or captions."""
+        return not self.enable_movement and not self.caption_service.enabled
+    
+    def _encode_static_scene(self, scene_assets: Dict, output_path: str):
+        """
+        Encode a still-image scene with ffmpeg directly, looping the image under the
+        scene's audio rather than pushing every identical frame through MoviePy.
+        The voiceover and background music are still mixed by the audio manager.
+        
+        Args:
+            scene_assets: Dictionary containing image_path, audio_path, etc.
+            output_path: Where the scene's video is written
+        """
+        audio_clip = AudioFileClip(scene_assets['audio_path'])
+        temp_audio_path = f"{output_path}.temp-audio.m4a"
+        try:
+            duration = audio_clip.duration
+            background_track = self.audio_manager.select_background_track(scene_assets.get('scene_description'),
+                                                                          self._scene_rng(scene_assets, duration))
+            mixed_audio = self.audio_manager.mix_audio(audio_clip, background_track)
+            mixed_audio.write_audiofile(temp_audio_path, fps=44100, codec='aac', verbose=False, logger=None)
+            
+            subprocess.run(
+                [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+                 '-loop', '1', '-framerate', str(self.fps), '-i', scene_assets['image_path'],
+                 '-i', temp_audio_path, '-t', f"{duration:.3f}",
+                 '-vf', f"scale={self.width}:{self.height},setsar=1",
+                 '-c:v', self.codec, *self._codec_params(still_image=True), '-pix_fmt', 'yuv420p',
+                 '-c:a', 'copy', output_path],
+                check=True, capture_output=True, text=True
+            )
+            music_status = "with music" if background_track else "no music"
+            print(f"Encoded still scene {music_status} - Duration: {duration:.2f}s")
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffmpeg scene encode failed: {e.stderr.strip()}") from e
+        finally:
+            audio_clip.close()
+            if os.path.exists(temp_audio_path):
+                os.remove(temp_audio_path)
+    
+    def _concat_files(self, video_paths: List[str], output_path: str):
+        """
+        Join videos with identical encoding settings using ffmpeg's concat demuxer (stream copy).
+        
+        Args:
+            video_paths: Videos to join, in order
+            output_path: Where the joined video is written
+        """
+        list_path = f"{os.path.splitext(output_path)[0]}.concat.txt"
+        with open(list_path, 'w') as f:
+            for video_path in video_paths:
+                escaped_path = os.path.abspath(video_path).replace("'", "'\\''")
+                f.write(f"file '{escaped_path}'\n")
+        
+        try:
+            subprocess.run(
+                [get_setting("FFMPEG_BINARY"), '-y', '-loglevel', 'error',
+                 '-f', 'concat', '-safe', '0', '-i', list_path,
+                 '-c', 'copy', output_path],
+                check=True, capture_output=True, text=True
+            )
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"ffmpeg concat failed: {e.stderr.strip()}") from e
+        finally:
+            os.remove(list_path)
     
     def get_video_info(self, video_path: str) -> Dict:
         """
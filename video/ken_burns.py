@@ -0,0 +1,128 @@
+"""
+Samplers for Ken Burns frames. `render_crop` is compiled with numba and is None without it;
+`upload_frame`/`render_crop_gpu` run on a CUDA device through CuPy when one is present.
+Without either the composer resamples with PIL instead.
+"""
+from functools import lru_cache
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # Optional accelerator
+    njit = None
+
+try:
+    import cupy as cp
+except ImportError:  # Optional accelerator
+    cp = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def render_crop(base, out, left, top, crop_width, crop_height):
+        """
+        Bilinearly resample the box (left, top, crop_width, crop_height) of base into out.
+
+        Args:
+            base: Source image, uint8 array of shape (height, width, channels)
+            out: Destination frame, uint8 array with the same channel count
+            left, top: Top-left corner of the box in source pixels
+            crop_width, crop_height: Size of the box in source pixels
+        """
+        out_height, out_width, channels = out.shape
+        src_height, src_width = base.shape[0], base.shape[1]
+        scale_x = crop_width / out_width
+        scale_y = crop_height / out_height
+
+        # Column sample positions are the same on every row, so work them out once
+        x0s = np.empty(out_width, dtype=np.int64)
+        x1s = np.empty(out_width, dtype=np.int64)
+        wxs = np.empty(out_width, dtype=np.float32)
+        for x in range(out_width):
+            fx = min(max(left + (x + 0.5) * scale_x - 0.5, 0.0), src_width - 1.0)
+            x0s[x] = int(fx)
+            x1s[x] = min(x0s[x] + 1, src_width - 1)
+            wxs[x] = fx - x0s[x]
+
+        for y in prange(out_height):
+            # Sample at pixel centres, clamped to the image
+            fy = min(max(top + (y + 0.5) * scale_y - 0.5, 0.0), src_height - 1.0)
+            y0 = int(fy)
+            y1 = min(y0 + 1, src_height - 1)
+            wy = np.float32(fy - y0)
+            upper_row = base[y0]
+            lower_row = base[y1]
+
+            for x in range(out_width):
+                x0 = x0s[x]
+                x1 = x1s[x]
+                wx = wxs[x]
+                for c in range(channels):
+                    upper = upper_row[x0, c] + (np.float32(upper_row[x1, c]) - upper_row[x0, c]) * wx
+                    lower = lower_row[x0, c] + (np.float32(lower_row[x1, c]) - lower_row[x0, c]) * wx
+                    out[y, x, c] = np.uint8(upper + (lower - upper) * wy + np.float32(0.5))
+else:
+    render_crop = None
+
+@lru_cache(maxsize=1)
+def _gpu_available() -> bool:
+    """
+    Whether CuPy can see a CUDA device. Checked on first use rather than at import, since
+    initialising CUDA in the parent would break the forked scene render workers.
+    """
+    if cp is None:
+        return False
+    try:
+        return cp.cuda.runtime.getDeviceCount() > 0
+    except Exception:  # CuPy installed without a usable driver
+        return False
+
+def sampler_name() -> str:
+    """Name of the sampler Ken Burns frames are drawn with: "cupy", "numba" or "pil"."""
+    if _gpu_available():
+        return "cupy"
+    return "numba" if render_crop is not None else "pil"
+
+def upload_frame(base: np.ndarray):
+    """
+    Copy a scene's frame-sized image to the GPU once, for render_crop_gpu.
+
+    Returns:
+        The image as a CuPy array, or None when no CUDA device is available
+    """
+    return cp.asarray(base) if _gpu_available() else None
+
+def _sample_crop(xp, base, out_shape, left, top, crop_width, crop_height):
+    """Bilinear resample of a box of base with array module xp, matching render_crop."""
+    out_height, out_width = out_shape[0], out_shape[1]
+    src_height, src_width = base.shape[0], base.shape[1]
+
+    # Sample at pixel centres, clamped to the image
+    xs = xp.clip(left + (xp.arange(out_width, dtype=xp.float32) + 0.5) * (crop_width / out_width) - 0.5, 0, src_width - 1)
+    ys = xp.clip(top + (xp.arange(out_height, dtype=xp.float32) + 0.5) * (crop_height / out_height) - 0.5, 0, src_height - 1)
+    x0 = xs.astype(xp.int32)
+    y0 = ys.astype(xp.int32)
+    x1 = xp.minimum(x0 + 1, src_width - 1)
+    y1 = xp.minimum(y0 + 1, src_height - 1)
+    wx = (xs - x0)[None, :, None]
+    wy = (ys - y0)[:, None, None]
+
+    upper_row = base[y0].astype(xp.float32)
+    lower_row = base[y1].astype(xp.float32)
+    upper = upper_row[:, x0] + (upper_row[:, x1] - upper_row[:, x0]) * wx
+    lower = lower_row[:, x0] + (lower_row[:, x1] - lower_row[:, x0]) * wx
+    return (upper + (lower - upper) * wy + 0.5).astype(xp.uint8)
+
+def render_crop_gpu(gpu_base, out, left, top, crop_width, crop_height) -> np.ndarray:
+    """
+    Bilinearly resample the box (left, top, crop_width, crop_height) of an uploaded image on the GPU.
+
+    Args:
+        gpu_base: Image returned by upload_frame
+        out: Host frame the result is copied into, uint8 array of shape (height, width, channels)
+        left, top: Top-left corner of the box in source pixels
+        crop_width, crop_height: Size of the box in source pixels
+
+    Returns:
+        out, ready for the encoder
+    """
+    return _sample_crop(cp, gpu_base, out.shape, left, top, crop_width, crop_height).get(out=out)
@@ -0,0 +1,46 @@
+"""
+Entry points for scene render worker processes.
+Kept free of heavy imports: a worker applies the parent's settings first, then
+loads the composer and the services it builds.
+"""
+import atexit
+from dataclasses import fields
+from typing import Dict
+from config.settings import get_settings, override_settings
+
+# Composer owned by this worker process
+_composer = None
+
+def settings_values() -> Dict:
+    """The current settings as constructor arguments, so worker processes can rebuild them."""
+    s = get_settings()
+    return {f.name: getattr(s, f.name) for f in fields(s) if f.init}
+
+def init_worker(values: Dict, threads: int):
+    """
+    Set up a scene render worker with the parent's settings and its own composer.
+    
+    Args:
+        values: Settings from settings_values() in the parent
+        threads: Threads this worker's frame sampler and encoder may each use,
+                 so that all workers together match the core count
+    """
+    global _composer
+    override_settings(**values)
+    
+    from video.composer import VideoComposer
+    _composer = VideoComposer(threads=threads)
+    
+    # Music decoders stay open across this worker's scenes; close them when it exits
+    from services.audio_manager import close_music_clips
+    atexit.register(close_music_clips)
+    
+    try:
+        import numba
+        numba.set_num_threads(min(threads, numba.config.NUMBA_NUM_THREADS))
+    except ImportError:
+        pass  # No compiled sampler to limit
+
+def render_scene(index: int, scene_assets: Dict, output_path: str) -> str:
+    """Build and encode one scene in this worker. See VideoComposer._render_scene."""
+    return _composer._render_scene(index, scene_assets, output_path)
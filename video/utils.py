@@ -1,5 +1,6 @@
 import os
 import shutil
+from operator import itemgetter
 from typing import List
 
 def ensure_directory(path: str) -> str:
@@ -9,31 +10,28 @@ def ensure_directory(path: str) -> str:
 
 def cleanup_directory(path: str) -> None:
     """Clean up a directory by removing all its contents."""
-    if os.path.exists(path):
-        shutil.rmtree(path)
+    shutil.rmtree(path, ignore_errors=True)
 
 def get_file_size_mb(file_path: str) -> float:
     """Get file size in megabytes."""
-    if os.path.exists(file_path):
-        return os.path.getsize(file_path) / (1024 * 1024)
-    return 0.0
+    try:
+        return os.stat(file_path).st_size / (1024 * 1024)
+    except OSError:
+        return 0.0
+
+_REQUIRED_FIELDS = ('sceneDescription', 'voiceoverText')
+_get_required_fields = itemgetter(*_REQUIRED_FIELDS)
 
 def validate_script(script: List[dict]) -> bool:
     """Validate that script has required fields."""
-    required_fields = ['sceneDescription', 'voiceoverText']
-    
     for i, scene in enumerate(script):
-        for field in required_fields:
-            if field not in scene:
-                print(f"Error: Scene {i+1} missing required field: {field}")
-                return False
-        
-        if not scene['sceneDescription'].strip():
-            print(f"Error: Scene {i+1} has empty sceneDescription")
+        try:
+            fields = _get_required_fields(scene)
+        except KeyError as e:
+            print(f"Error: Scene {i+1} missing required field: {e.args[0]}")
             return False
-            
-        if not scene['voiceoverText'].strip():
-            print(f"Error: Scene {i+1} has empty voiceoverText")
-            return False
-    
+        for field, value in zip(_REQUIRED_FIELDS, fields):
+            if not value.strip():
+                print(f"Error: Scene {i+1} has empty {field}")
+                return False
     return True